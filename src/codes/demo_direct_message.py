@@ -4,7 +4,7 @@ import asyncio
 from autogen_core import AgentId, MessageContext, RoutedAgent, SingleThreadedAgentRuntime, message_handler
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Message:
     content: str
 
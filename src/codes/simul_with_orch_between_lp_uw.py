@@ -3,27 +3,100 @@
 """
 
 from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
 from autogen_agentchat.conditions import HandoffTermination, TextMentionTermination
 from autogen_agentchat.messages import HandoffMessage
 from autogen_agentchat.teams import Swarm
-from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 from dotenv import load_dotenv
+from openai import AsyncOpenAI
+import argparse
+import functools
+import httpx
+import inspect
 import os
 import asyncio
+import json
 from typing import Annotated
 
+from underwriting_rules import (
+    UW_APPRAISAL_GAP, UW_CONDITIONS, UW_CREDIT_LOW, UW_DTI_HIGH, UW_LTV_HIGH, UW_RESERVES_LOW,
+    conditions_from_mask, underwriting_condition_mask
+)
+
 load_dotenv()
 API_KEY = os.environ.get("OPENAI_API_KEY")
 
-model_client = OpenAIChatCompletionClient(
-    model="gpt-4o-mini",
-    api_key=API_KEY,
-)
+
+@functools.lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """One pooled HTTP client so every agent and task reuses keep-alive connections."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+        timeout=60
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_model_client() -> OpenAIChatCompletionClient:
+    """Model client shared by all agents; built once per process."""
+    return OpenAIChatCompletionClient(
+        model="gpt-4o-mini",
+        api_key=API_KEY,
+        http_client=get_http_client(),
+    )
+
+
+model_client = get_model_client()
+
+
+# ============== TOOL CALL DEDUPLICATION ==============
+
+class AsyncMemo:
+    """Share one in-flight call between identical concurrent tool calls.
+
+    With several loan files running at once, agents often call the same
+    read-only tool with the same arguments. The first caller runs the tool,
+    and later callers await the same future. Nothing is kept once the call
+    settles, so a call made after a write always sees fresh state.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple, asyncio.Future] = {}
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            if key in self._pending:
+                return await asyncio.shield(self._pending[key])
+
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            try:
+                result = await fn(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except BaseException as e:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure is not logged twice
+                future.exception()
+                raise
+            finally:
+                del self._pending[key]
+            future.set_result(result)
+            return result
+
+        return wrapper
+
+
+tool_memo = AsyncMemo()
 
 
 # ============== TOOLS (Async) ==============
 
+@tool_memo
 async def get_workflow_state() -> str:
     """Get current state of the loan workflow to determine next agent."""
     # This would integrate with your workflow engine
@@ -42,6 +115,7 @@ async def submit_to_underwriting(
     return f"File submitted to underwriting: LTV={ltv_ratio}%, DTI={dti_ratio}%. Status: Pending Review. Hand off to underwriter for evaluation."
 
 
+@tool_memo
 async def check_underwriting_conditions(
         ltv_ratio: float,
         dti_ratio: float,
@@ -51,32 +125,9 @@ async def check_underwriting_conditions(
         loan_amount: float
 ) -> dict:
     """Run automated underwriting rules (DTI/LTV/credit checks)."""
-    conditions = []
-
-    # DTI check (conventional max ~43-50%)
-    if dti_ratio > 43:
-        conditions.append("VOE: Verify employment stability due to high DTI")
-
-    # LTV check (conventional max ~80% without PMI)
-    if ltv_ratio > 80:
-        conditions.append("PMI: Private Mortgage Insurance required")
-
-    # Credit score check
-    if credit_score < 620:
-        conditions.append("LOE: Letter of Explanation for credit score below 620")
-
-    # Reserves check (typically 2-6 months)
-    if reserves < 2:
-        conditions.append("RESERVES: Provide proof of 2 months PITI reserves")
-
-    # Appraisal/value check
-    if appraisal_value < loan_amount / (ltv_ratio / 100):
-        conditions.append("APPRAISAL: Value discrepancy - review comparables")
-
-    if not conditions:
-        return {"status": "CLEAR_TO_CLOSE", "conditions": []}
-    else:
-        return {"status": "CONDITIONAL_APPROVAL", "conditions": conditions}
+    return conditions_from_mask(underwriting_condition_mask(
+        ltv_ratio, dti_ratio, credit_score, reserves, appraisal_value, loan_amount
+    ))
 
 
 async def resubmit_with_conditions_cleared(
@@ -94,13 +145,10 @@ async def issue_final_approval() -> str:
     return "FINAL APPROVAL ISSUED: Clear to Close (CTC). File ready for funding."
 
 
-# ============== ORCHESTRATOR AGENT ==============
+# ============== SYSTEM MESSAGES ==============
 # TODO: maybe remove in the future. add more functions. avoid using just string.
-orchestrator_agent = AssistantAgent(
-    "orchestrator_agent",
-    model_client=model_client,
-    handoffs=["loan_processor_agent", "underwriter_agent"],
-    system_message="""You are the orchestrator agent tasked with routing the loan file to the appropriate agent.
+# cleandoc strips the source indentation so it is not sent to the model on every turn
+ORCHESTRATOR_SYSTEM_MESSAGE = inspect.cleandoc("""You are the orchestrator agent tasked with routing the loan file to the appropriate agent.
 
     Workflow sequence: loan_processor → underwriter → loan_processor (if conditions) → underwriter (final approval)
 
@@ -113,17 +161,9 @@ orchestrator_agent = AssistantAgent(
 
     Use get_workflow_state to understand current state if needed.
     Only handoff to the most appropriate agent based on the current workflow stage.
-    """,
-    reflect_on_tool_use=True,
-    tools=[get_workflow_state]
-)
+    """)
 
-# ============== LOAN PROCESSOR AGENT ==============
-loan_processor_agent = AssistantAgent(
-    "loan_processor_agent",
-    model_client=model_client,
-    handoffs=["orchestrator_agent"],
-    system_message="""You are a Loan Processor with AUTONOMOUS TASK MANAGEMENT.
+LOAN_PROCESSOR_SYSTEM_MESSAGE = inspect.cleandoc("""You are a Loan Processor with AUTONOMOUS TASK MANAGEMENT.
 
     CONCURRENT TASK STRATEGY:
     When you receive a new loan file, you should IMMEDIATELY launch ALL independent tasks in parallel:
@@ -154,18 +194,9 @@ loan_processor_agent = AssistantAgent(
     "I'm launching 4 concurrent tasks: ordering credit report, ordering appraisal, ordering flood cert, and verifying employment. These can all run in parallel."
 
     Then call all 4 tools without waiting for responses in between.
-    """,
-    reflect_on_tool_use=True,
-    tools=[submit_to_underwriting, resubmit_with_conditions_cleared]
-)
-
-# ============== UNDERWRITER AGENT ==============
+    """)
 
-underwriter_agent = AssistantAgent(
-    "underwriter_agent",
-    model_client=model_client,
-    handoffs=["orchestrator_agent"],
-    system_message="""You are an Underwriter.
+UNDERWRITER_SYSTEM_MESSAGE = inspect.cleandoc("""You are an Underwriter.
 
     Your responsibilities:
     1. COMPLIANCE REVIEW: When you receive a submitted file from loan_processor:
@@ -200,20 +231,80 @@ underwriter_agent = AssistantAgent(
     DO NOT HANDOFF until you have called the appropriate tool.
     Always provide clear, specific condition requirements.
     Handoff to orchestrator_agent after completing your evaluation.
-    """,
-    reflect_on_tool_use=True,
-    tools=[check_underwriting_conditions, issue_final_approval]
+    """)
+
+# Batch requests are single-turn with no tools, so the batch underwriter decides
+# directly and answers in check_underwriting_conditions' output shape
+_CONDITION_TEXT = dict(UW_CONDITIONS)
+BATCH_UNDERWRITER_SYSTEM_MESSAGE = inspect.cleandoc("""You are an Underwriter reviewing a complete loan file in one pass.
+    You have no tools and no other agents: compute the ratios from the file yourself and decide now.
+    DTI = monthly debts / monthly income. LTV = loan amount / appraised value.
+
+    CONDITIONS (add each that applies, text exactly as given):
+    - DTI above 43%: "{dti}"
+    - LTV above 80%: "{ltv}"
+    - Credit score below 620: "{credit}"
+    - Reserves below 2 months: "{reserves}"
+    - Appraised value below the value the LTV was based on: "{appraisal}"
+
+    DECLINE instead if DTI is above 50% with no compensating factors, the credit score is below 580,
+    or the appraisal is significantly below the loan amount.
+
+    Reply with only a JSON object:
+    {{"status": "CLEAR_TO_CLOSE" | "CONDITIONAL_APPROVAL" | "DECLINED", "conditions": [...], "reason": "<one sentence>"}}
+    """).format(
+    dti=_CONDITION_TEXT[UW_DTI_HIGH],
+    ltv=_CONDITION_TEXT[UW_LTV_HIGH],
+    credit=_CONDITION_TEXT[UW_CREDIT_LOW],
+    reserves=_CONDITION_TEXT[UW_RESERVES_LOW],
+    appraisal=_CONDITION_TEXT[UW_APPRAISAL_GAP],
 )
 
+
 # ============== SWARM TEAM ==============
 
-termination = HandoffTermination(target="user") | TextMentionTermination("TERMINATE")
+def build_team() -> Swarm:
+    """Build a fresh Swarm with its own agents.
+
+    Agents keep their model context between runs, so concurrently running
+    tasks each need their own team. A team can be reused for a later task
+    once it has been reset.
+    """
+    orchestrator_agent = AssistantAgent(
+        "orchestrator_agent",
+        model_client=model_client,
+        handoffs=["loan_processor_agent", "underwriter_agent"],
+        system_message=ORCHESTRATOR_SYSTEM_MESSAGE,
+        reflect_on_tool_use=True,
+        tools=[get_workflow_state]
+    )
+
+    loan_processor_agent = AssistantAgent(
+        "loan_processor_agent",
+        model_client=model_client,
+        handoffs=["orchestrator_agent"],
+        system_message=LOAN_PROCESSOR_SYSTEM_MESSAGE,
+        reflect_on_tool_use=True,
+        tools=[submit_to_underwriting, resubmit_with_conditions_cleared]
+    )
+
+    underwriter_agent = AssistantAgent(
+        "underwriter_agent",
+        model_client=model_client,
+        handoffs=["orchestrator_agent"],
+        system_message=UNDERWRITER_SYSTEM_MESSAGE,
+        reflect_on_tool_use=True,
+        tools=[check_underwriting_conditions, issue_final_approval]
+    )
+
+    termination = HandoffTermination(target="user") | TextMentionTermination("TERMINATE")
+
+    return Swarm(
+        [orchestrator_agent, loan_processor_agent, underwriter_agent],
+        termination_condition=termination,
+        max_turns=25
+    )
 
-team = Swarm(
-    [orchestrator_agent, loan_processor_agent, underwriter_agent],
-    termination_condition=termination,
-    max_turns=25
-)
 
 # ============== TASK DEFINITIONS ==============
 
@@ -263,38 +354,167 @@ Please process this file for underwriting.
 """
 
 
+TASKS = [task_standard_loan, task_high_dti, task_low_credit]
+
+# Upper bound on loan files processed at the same time
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "8"))
+
+
 # ============== RUN FUNCTION ==============
 
-async def run_team_stream() -> None:
-    """Run the loan processing workflow."""
-    print("\n" + "=" * 60)
-    print("LOAN PROCESSING WORKFLOW - SWARM ARCHITECTURE")
-    print("=" * 60 + "\n")
+async def print_messages(queue: asyncio.Queue) -> None:
+    """Print streamed agent messages as they arrive.
+
+    Runs as its own consumer so slow output never holds up the agents.
+    A ``None`` item stops the consumer.
+    """
+    while (message := await queue.get()) is not None:
+        print(f"---------- {type(message).__name__} ({message.source}) ----------")
+        print(message.to_text(), flush=True)
+
 
-    task_result = await Console(team.run_stream(task=task_standard_loan))
-    last_message = task_result.messages[-1]
+async def stream_task(team: Swarm, task, queue: asyncio.Queue) -> TaskResult:
+    """Run the team on a task, forwarding each message as it is produced."""
+    async for message in team.run_stream(task=task):
+        if isinstance(message, TaskResult):
+            return message
+        queue.put_nowait(message)
 
-    # Handle user handoffs (if agents need human input)
-    while isinstance(last_message, HandoffMessage) and last_message.target == "user":
-        user_message = input("\nUser input needed: ")
 
-        task_result = await Console(
-            team.run_stream(
-                task=HandoffMessage(
+async def run_one_task(task: str, team_pool: asyncio.Queue, queue: asyncio.Queue) -> TaskResult:
+    """Run a single loan file on a team borrowed from the pool."""
+    team = await team_pool.get()
+    try:
+        # Clear the previous file's conversation before reusing the team
+        await team.reset()
+        task_result = await stream_task(team, task, queue)
+        last_message = task_result.messages[-1]
+
+        # Handle user handoffs (if agents need human input)
+        while isinstance(last_message, HandoffMessage) and last_message.target == "user":
+            user_message = await asyncio.to_thread(input, "\nUser input needed: ")
+
+            task_result = await stream_task(
+                team,
+                HandoffMessage(
                     source="user",
                     target=last_message.source,
                     content=user_message
-                )
+                ),
+                queue
             )
-        )
-        last_message = task_result.messages[-1]
+            last_message = task_result.messages[-1]
+
+        return task_result
+    finally:
+        team_pool.put_nowait(team)
+
+
+async def run_team_stream() -> None:
+    """Run the loan processing workflow for every task concurrently."""
+    print("\n" + "=" * 60)
+    print("LOAN PROCESSING WORKFLOW - SWARM ARCHITECTURE")
+    print("=" * 60 + "\n")
+
+    # The pool size also caps how many files are in flight at once
+    team_pool: asyncio.Queue[Swarm] = asyncio.Queue()
+    for _ in range(min(MAX_INFLIGHT, len(TASKS))):
+        team_pool.put_nowait(build_team())
+
+    queue: asyncio.Queue = asyncio.Queue()
+    printer = asyncio.create_task(print_messages(queue))
+    try:
+        await asyncio.gather(*(run_one_task(task, team_pool, queue) for task in TASKS))
+    finally:
+        queue.put_nowait(None)
+        await printer
 
     print("\n" + "=" * 60)
     print("WORKFLOW COMPLETED")
     print("=" * 60)
 
 
+# ============== BATCH MODE ==============
+
+# Seconds between batch status checks
+BATCH_POLL_SECONDS = 30
+BATCH_MODEL = "gpt-4o-mini"
+
+
+def build_batch_requests() -> list[dict]:
+    """One single-turn chat completion per task, using the tool-free batch underwriter prompt."""
+    return [
+        {
+            "custom_id": f"task-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": BATCH_MODEL,
+                "messages": [
+                    {"role": "system", "content": BATCH_UNDERWRITER_SYSTEM_MESSAGE},
+                    {"role": "user", "content": task},
+                ],
+                "response_format": {"type": "json_object"},
+            },
+        }
+        for i, task in enumerate(TASKS)
+    ]
+
+
+async def run_batch() -> None:
+    """Submit every task as one OpenAI batch and print the decisions.
+
+    The Batch API is single-turn, so there are no handoffs or tool calls
+    here: each file gets one direct underwriter decision as JSON. Use this for offline runs
+    where the 50% batch discount matters more than latency.
+    """
+    print("\n" + "=" * 60)
+    print("LOAN PROCESSING WORKFLOW - BATCH MODE")
+    print("=" * 60 + "\n")
+
+    client = AsyncOpenAI(api_key=API_KEY, http_client=get_http_client())
+    payload = "\n".join(json.dumps(request) for request in build_batch_requests())
+
+    batch_file = await client.files.create(
+        file=("loan_batch.jsonl", payload.encode("utf-8")),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} with {len(TASKS)} loan files")
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await client.batches.retrieve(batch.id)
+        print(f"Batch {batch.id}: {batch.status}")
+
+    if batch.status != "completed" or not batch.output_file_id:
+        print(f"Batch {batch.id} ended with status {batch.status}")
+        return
+
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        record = json.loads(line)
+        message = record["response"]["body"]["choices"][0]["message"]["content"]
+        print("\n" + "-" * 60)
+        print(record["custom_id"])
+        print("-" * 60)
+        print(message)
+
+    print("\n" + "=" * 60)
+    print("BATCH COMPLETED")
+    print("=" * 60)
+
+
 # ============== MAIN ==============
 
 if __name__ == "__main__":
-    asyncio.run(run_team_stream())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", action="store_true",
+                        help="submit all tasks through the OpenAI Batch API instead of running the swarm")
+    args = parser.parse_args()
+
+    asyncio.run(run_batch() if args.batch else run_team_stream())
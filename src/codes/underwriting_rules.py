@@ -0,0 +1,61 @@
+"""
+@description: Automated underwriting rules for the simulated underwriter, as one bitmask per loan file
+"""
+
+# Underwriting rules, one bit per rule
+UW_DTI_HIGH = 1 << 0
+UW_LTV_HIGH = 1 << 1
+UW_CREDIT_LOW = 1 << 2
+UW_RESERVES_LOW = 1 << 3
+UW_APPRAISAL_GAP = 1 << 4
+
+# (bit, condition text), in reporting order
+UW_CONDITIONS = (
+    # DTI check (conventional max ~43-50%)
+    (UW_DTI_HIGH, "VOE: Verify employment stability due to high DTI"),
+    # LTV check (conventional max ~80% without PMI)
+    (UW_LTV_HIGH, "PMI: Private Mortgage Insurance required"),
+    # Credit score check
+    (UW_CREDIT_LOW, "LOE: Letter of Explanation for credit score below 620"),
+    # Reserves check (typically 2-6 months)
+    (UW_RESERVES_LOW, "RESERVES: Provide proof of 2 months PITI reserves"),
+    # Appraisal/value check
+    (UW_APPRAISAL_GAP, "APPRAISAL: Value discrepancy - review comparables"),
+)
+
+
+def underwriting_condition_mask(
+        ltv_ratio: float,
+        dti_ratio: float,
+        credit_score: int,
+        reserves: int,
+        appraisal_value: float,
+        loan_amount: float
+) -> int:
+    """Evaluate every underwriting rule and return the triggered bits."""
+    return (
+        (dti_ratio > 43) * UW_DTI_HIGH
+        | (ltv_ratio > 80) * UW_LTV_HIGH
+        | (credit_score < 620) * UW_CREDIT_LOW
+        | (reserves < 2) * UW_RESERVES_LOW
+        | (appraisal_value < loan_amount / (ltv_ratio / 100)) * UW_APPRAISAL_GAP
+    )
+
+
+def conditions_from_mask(mask: int) -> dict:
+    """Turn a condition bitmask into the underwriting decision dict."""
+    if not mask:
+        return {"status": "CLEAR_TO_CLOSE", "conditions": []}
+    conditions = [text for bit, text in UW_CONDITIONS if mask & bit]
+    return {"status": "CONDITIONAL_APPROVAL", "conditions": conditions}
+
+
+def check_underwriting_conditions_batch(loan_files: list[dict]) -> list[dict]:
+    """Run the underwriting rules over many files at once.
+
+    Each entry takes the same keyword arguments as
+    check_underwriting_conditions. Condition text is only built for
+    files that trigger a rule.
+    """
+    masks = [underwriting_condition_mask(**loan) for loan in loan_files]
+    return [conditions_from_mask(mask) for mask in masks]
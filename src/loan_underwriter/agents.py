@@ -3,295 +3,284 @@ Agent definitions with autonomous concurrent task management
 """
 
 from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Response
+from autogen_agentchat.messages import HandoffMessage, TextMessage
+from autogen_core.model_context import HeadAndTailChatCompletionContext
 from autogen_ext.models.openai import OpenAIChatCompletionClient
+import asyncio
+import httpx
 import os
+from functools import lru_cache, wraps
+from pathlib import Path
+from pydantic import BaseModel
 
-from openai.types.beta import FunctionTool
-
-from src.loan_underwriter.tools_loan_processor import collect_documents
+from models import PhaseSummary
+from routing import ROUTE_TERMINATE, route_message
 # Import all tools
 from tools_loan_processor import (
     verify_loan_documents, validate_document_quality, order_credit_report,
     calculate_loan_ratios, order_appraisal, receive_appraisal,
     order_flood_certification, verify_employment, submit_to_underwriting,
-    clear_underwriting_conditions
+    clear_underwriting_conditions, collect_documents
 )
 from tools_underwriter import (
     run_automated_underwriting, review_credit_profile, review_income_employment,
     review_assets_reserves, review_property_appraisal,
     issue_underwriting_conditions, issue_final_approval, deny_loan
 )
-
-API_KEY = os.environ.get("OPENAI_API_KEY")
-
-model_client = OpenAIChatCompletionClient(
-    model="gpt-4o-mini",
-    api_key=API_KEY,
+from src.loan_underwriter.external_systems import (
+    CreditBureauSimulator, AppraisalManagementSimulator, FloodCertificationSimulator,
+    EmploymentVerificationSimulator, AutomatedUnderwritingSimulator
 )
 
-model_client4o = OpenAIChatCompletionClient(
-    model="gpt-4o",
-    api_key=API_KEY,
-)
+
+def get_api_key() -> str:
+    """Read the OpenAI key, failing before any client or agent is built."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    return api_key
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """One keep-alive connection pool shared by every agent's OpenAI client."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        timeout=httpx.Timeout(60, connect=5),
+    )
+
+
+async def prewarm_connections() -> None:
+    """Open a pooled connection to the API before the first agent call,
+    so DNS and TLS setup is not paid on the first loan's critical path."""
+    try:
+        await get_http_client().get(
+            "https://api.openai.com/v1/models",
+            headers={"Authorization": f"Bearer {get_api_key()}"}
+        )
+    except httpx.HTTPError:
+        pass  # Only a warm-up; the real call will report any problem
+
+
+async def close_http_client() -> None:
+    """Close the shared connection pool; call once before the event loop exits."""
+    await get_http_client().aclose()
+
+
+@lru_cache(maxsize=None)
+def get_model_client(
+        model: str,
+        parallel_tool_calls: bool = False,
+        response_format: type[BaseModel] | None = None,
+        max_tokens: int | None = None,
+        stop: tuple[str, ...] | None = None
+) -> OpenAIChatCompletionClient:
+    """Return the shared client for a model, creating it on first use.
+
+    Agents with tools ask for parallel_tool_calls so independent tools come
+    back in one response and run together, instead of one round-trip each.
+    OpenAI rejects the flag on requests without tools, so it is opt-in.
+    A response_format model makes every text reply follow that schema.
+    max_tokens and stop bound how much a reply can decode.
+    """
+    extra = {}
+    if parallel_tool_calls:
+        extra["parallel_tool_calls"] = True
+    if response_format is not None:
+        extra["response_format"] = response_format
+    if max_tokens is not None:
+        extra["max_tokens"] = max_tokens
+    if stop:
+        extra["stop"] = list(stop)
+    return OpenAIChatCompletionClient(
+        model=model,
+        api_key=get_api_key(),
+        http_client=get_http_client(),
+        **extra,
+    )
+
+
+# ============== PROMPTS ==============
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+
+@lru_cache(maxsize=None)
+def load_prompt(name: str) -> str:
+    """Read a system prompt from prompts/<name>.md, once per process."""
+    return (PROMPTS_DIR / f"{name}.md").read_text(encoding="utf-8")
+
+
+def worker_prompt(name: str) -> str:
+    """Worker prompts share the workflow overview as a byte-identical prefix,
+    so OpenAI prompt caching can match it across agents."""
+    return load_prompt("workflow_overview") + "\n" + load_prompt(name)
+
+
+# ============== HISTORY TRIMMING ==============
+# Messages each agent sends to the model: the opening task plus the most recent turns.
+# Older turns are not needed; the loan file on disk carries the workflow state.
+HISTORY_HEAD = 1
+HISTORY_TAIL = 6
+
+
+def trimmed_context() -> HeadAndTailChatCompletionContext:
+    """A fresh bounded model context, so prompt size stays flat as handoffs pile up."""
+    return HeadAndTailChatCompletionContext(head_size=HISTORY_HEAD, tail_size=HISTORY_TAIL)
+
+
+# ============== TOOL TIMEOUTS ==============
+# Seconds a tool may run before the agent is told it timed out.
+# This layer owns the overall deadline; external_systems.with_retry only bounds
+# each attempt. A tool that calls a retried simulator gets that simulator's full
+# retry budget plus TOOL_OVERHEAD for the loan lock and file I/O, so a slow
+# first attempt cannot use up the budget and cancel the retries. Time spent
+# queueing for an external system's concurrency limit is not counted.
+TOOL_OVERHEAD = 2
+TOOL_TIMEOUTS = {
+    "order_credit_report": CreditBureauSimulator.pull_credit_report.deadline + TOOL_OVERHEAD,
+    "order_appraisal": AppraisalManagementSimulator.order_appraisal.deadline + TOOL_OVERHEAD,
+    "order_flood_certification": FloodCertificationSimulator.check_flood_zone.deadline + TOOL_OVERHEAD,
+    "verify_employment": EmploymentVerificationSimulator.verify_employment.deadline + TOOL_OVERHEAD,
+    "run_automated_underwriting": (
+        AutomatedUnderwritingSimulator.run_automated_underwriting.deadline + TOOL_OVERHEAD
+    ),
+}
+DEFAULT_TOOL_TIMEOUT = 10
+
+
+def with_timeout(tool):
+    """Bound a tool's runtime so one stalled external system cannot hold up
+    the other tool calls in the same batch. A timeout comes back as a normal
+    tool result the agent can note and move past."""
+    timeout = TOOL_TIMEOUTS.get(tool.__name__, DEFAULT_TOOL_TIMEOUT)
+    # Tools behind limit_concurrency: take the slot first, then start the clock
+    semaphore = getattr(tool, "semaphore", None)
+
+    @wraps(tool)
+    async def wrapper(*args, **kwargs):
+        try:
+            if semaphore is None:
+                return await asyncio.wait_for(tool(*args, **kwargs), timeout)
+            async with semaphore:
+                return await asyncio.wait_for(tool.__wrapped__(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            return f"❌ TIMEOUT: {tool.__name__} did not respond within {timeout:g}s. Continue with the other tasks."
+
+    return wrapper
+
+
+# ============== KEYWORD ROUTING ==============
+
+class KeywordRoutingAgent(AssistantAgent):
+    """Orchestrator that routes recognizable workflow states (see routing.py)
+    and only calls the model for everything else (blocking errors, odd states)."""
+
+    async def on_messages_stream(self, messages, cancellation_token):
+        # The latest worker report; handoff messages only say who transferred
+        latest = next(
+            (m.content for m in reversed(messages)
+             if not isinstance(m, HandoffMessage) and isinstance(getattr(m, "content", None), str)),
+            ""
+        )
+        target = route_message(latest)
+
+        if target == ROUTE_TERMINATE:
+            yield Response(chat_message=TextMessage(
+                source=self.name,
+                content="The loan decision has been issued. TERMINATE"
+            ))
+        elif target is not None:
+            yield Response(chat_message=HandoffMessage(
+                source=self.name,
+                target=target,
+                content=f"Transferred to {target}."
+            ))
+        else:
+            async for event in super().on_messages_stream(messages, cancellation_token):
+                # Any text reply from the orchestrator ends the workflow. The TERMINATE stop
+                # sequence cuts the word itself, so put it back for TextMentionTermination.
+                if (isinstance(event, Response)
+                        and isinstance(event.chat_message, TextMessage)
+                        and ROUTE_TERMINATE not in event.chat_message.content):
+                    event = Response(
+                        chat_message=TextMessage(
+                            source=self.name,
+                            content=f"{event.chat_message.content.rstrip()} {ROUTE_TERMINATE}"
+                        ),
+                        inner_messages=event.inner_messages
+                    )
+                yield event
 
 
 # ============== ORCHESTRATOR AGENT ==============
-orchestrator_agent = AssistantAgent(
-    "orchestrator_agent",
-    model_client=model_client4o,
-    handoffs=["loan_processor_agent", "underwriter_agent"],
-    system_message="""You are the orchestrator agent for mortgage loan underwriting workflow.
-
-=== CRITICAL: TERMINATION RULES (ENFORCE STRICTLY) ===
-
-**HANDOFF LIMIT:**
-- Track every handoff you make mentally
-- After 15 total handoffs, immediately respond: "TERMINATE - Maximum handoff limit of 15 reached. Workflow requires manual intervention."
-- DO NOT exceed 15 handoffs under any circumstances
-
-**LOOP DETECTION:**
-- If you transfer to the SAME agent 3 times in a row without any status change, immediately respond: "TERMINATE - Infinite loop detected. No progress being made."
-- Progress means: new documents received, conditions cleared, status changed, approval/denial issued
-
-**ERROR HANDLING:**
-- If the same error occurs twice (e.g., "maintenance window", "file not found"), immediately respond: "TERMINATE - Persistent error: [error description]. Manual intervention required."
-- If agents keep saying "waiting" or "pending" for 5+ handoffs, respond: "TERMINATE - Workflow stalled. Manual review needed."
-
-**ALWAYS TERMINATE ON:**
-- Final approval → "The loan has been approved. Clear to close. TERMINATE"
-- Loan denial → "The loan has been denied. Adverse action notice issued. TERMINATE"  
-- Max handoffs (15) → "TERMINATE - Maximum handoff limit reached."
-- Infinite loop → "TERMINATE - Loop detected between agents."
-- Persistent errors → "TERMINATE - Error persists: [error]. Manual intervention required."
-
-**CRITICAL:** Your LAST word must be exactly "TERMINATE" when ending the workflow.
-
-**DO NOT:**
-- Ask the user to fix issues (this is autonomous)
-- Say "please inform me" or "keep me updated" (no human is listening)
-- Wait indefinitely for external events
-- Handoff more than 3 times without progress
-
-**Example Termination:**
-"The loan processor encountered a persistent maintenance window error with the credit bureau. After 3 attempts, the issue persists. TERMINATE"
-
-=== END TERMINATION RULES ===
-
-Your role is to route efficiently, detect problems early, and TERMINATE when necessary.
-""",
-    reflect_on_tool_use=False,
-    tools=[]
-)
+# Fallback router for files the workers cannot route themselves; the small model is enough
+@lru_cache(maxsize=None)
+def get_orchestrator() -> AssistantAgent:
+    """Fallback router, built on first use."""
+    return KeywordRoutingAgent(
+        "orchestrator_agent",
+        # Routing replies are tiny: cap decoding and stop at TERMINATE
+        model_client=get_model_client("gpt-4o-mini", max_tokens=64, stop=(ROUTE_TERMINATE,)),
+        handoffs=["loan_processor_agent", "underwriter_agent"],
+        system_message=load_prompt("orchestrator"),
+        model_context=trimmed_context(),
+        reflect_on_tool_use=False,
+        tools=[]
+    )
 
 
 # ============== LOAN PROCESSOR AGENT ==============
 
-loan_processor_agent = AssistantAgent(
-    "loan_processor_agent",
-    model_client=model_client4o,
-    handoffs=["orchestrator_agent"],
-    system_message="""You are an AUTONOMOUS Loan Processor with concurrent task management capabilities.
-
-CORE PRINCIPLE: MAXIMIZE PARALLELISM
-You can and SHOULD launch multiple independent tasks concurrently. Don't wait for one task to finish before starting another if they don't depend on each other.
-
-=== TASK DEPENDENCY GRAPH ===
-
-PHASE 1 - CONCURRENT LAUNCH (no dependencies, run ALL in parallel):
-├─ verify_loan_documents()          [1s] - Check all docs present
-├─ order_credit_report()            [2-5s] - Pull credit from bureau
-├─ order_appraisal()                [1-2s] - Order property appraisal
-├─ order_flood_certification()      [1s] - Check flood zone
-└─ verify_employment()              [1-3s] - VOE with employer
-
-PHASE 2 - AFTER CREDIT REPORT (sequential):
-└─ calculate_loan_ratios()          [1s] - Needs credit report for DTI
-
-PHASE 3 - AFTER RATIOS CALCULATED (sequential):
-└─ submit_to_underwriting()         [1s] - Final submission
-
-PHASE 4 - WHEN APPRAISAL ARRIVES (can happen anytime):
-└─ receive_appraisal()              [1s] - Process completed appraisal
-
-=== YOUR WORKFLOW ===
-
-When you receive a NEW loan file:
-1. SAY: "Launching Phase 1: 5 concurrent tasks..."
-2. CALL ALL 5 Phase 1 tools WITHOUT waiting between calls
-3. After results come back, analyze what's complete
-4. SAY: "Phase 1 complete. Launching Phase 2..."
-5. CALL calculate_loan_ratios()
-6. CALL submit_to_underwriting()
-7. Handoff to orchestrator
-
-When you receive CONDITIONAL APPROVAL:
-1. Review the conditions list
-2. SAY: "Received X conditions. Analyzing clearance strategy..."
-3. For simple conditions: Acknowledge and mark as cleared
-4. CALL clear_underwriting_conditions() with all cleared items
-5. Handoff to orchestrator for resubmission
-
-=== COMMUNICATION STYLE ===
-Be explicit about parallelism:
-✅ GOOD: "Launching 5 tasks concurrently: credit, appraisal, flood, employment, documents..."
-❌ BAD: "First I'll order credit, then I'll order appraisal..." (too sequential!)
-
-✅ GOOD: "All Phase 1 tasks complete. Results: Credit score 720, flood zone X, employment verified..."
-❌ BAD: Repeating full tool output (summarize!)
-
-=== EXCEPTION HANDLING ===
-- Timeouts: Note them, continue with other tasks
-- Missing data: Flag it, don't block other work
-- Errors: Log them, inform orchestrator if critical
-
-=== CRITICAL RULES ===
-- DO NOT handoff until you've called appropriate tools
-- DO NOT wait unnecessarily between independent tasks
-- DO summarize results concisely
-- DO handoff to orchestrator when your phase is complete
-
-When in doubt: Can these tasks run at the same time? If yes, launch them together!
-
-=== HANDLING BLOCKED WORKFLOWS ===
-
-If you encounter a blocking error (maintenance window, system down, etc.):
-
-1. **First time:** Mention the issue and transfer to orchestrator
-2. **If orchestrator routes you back:** Check if the issue is resolved
-3. **If issue persists:** Respond: "Unable to proceed due to [error]. This workflow cannot continue. Transferring to orchestrator for termination."
-
-DO NOT keep saying "waiting for updates" indefinitely.
-DO NOT hand back to orchestrator more than twice for the same issue.
-
-If credit report fails multiple times, state clearly: "Credit report retrieval failed after retries. Workflow blocked."
-""",
-    reflect_on_tool_use=True,
-    tools=[
-        verify_loan_documents,
-        validate_document_quality,
-        order_credit_report,
-        calculate_loan_ratios,
-        order_appraisal,
-        receive_appraisal,
-        order_flood_certification,
-        verify_employment,
-        submit_to_underwriting,
-        clear_underwriting_conditions,
-        collect_documents
-    ]
-)
+@lru_cache(maxsize=None)
+def get_loan_processor() -> AssistantAgent:
+    """Loan processor agent, built on first use."""
+    return AssistantAgent(
+        "loan_processor_agent",
+        model_client=get_model_client("gpt-4o", parallel_tool_calls=True, response_format=PhaseSummary),
+        # Workers hand off to each other directly; the orchestrator is only a fallback
+        handoffs=["underwriter_agent", "orchestrator_agent"],
+        system_message=worker_prompt("loan_processor"),
+        model_context=trimmed_context(),
+        # Phase 1 results are forwarded as-is; the swarm keeps this agent active,
+        # so it reads them on its next turn without a separate reflection call
+        reflect_on_tool_use=False,
+        tools=[with_timeout(tool) for tool in (
+            verify_loan_documents,
+            validate_document_quality,
+            order_credit_report,
+            calculate_loan_ratios,
+            order_appraisal,
+            receive_appraisal,
+            order_flood_certification,
+            verify_employment,
+            submit_to_underwriting,
+            clear_underwriting_conditions,
+            collect_documents
+        )]
+    )
 
 
 # ============== UNDERWRITER AGENT ==============
 
-underwriter_agent = AssistantAgent(
-    "underwriter_agent",
-    model_client=model_client4o,
-    handoffs=["orchestrator_agent"],
-    system_message="""You are an AUTONOMOUS Underwriter with concurrent review capabilities.
-
-CORE PRINCIPLE: PARALLEL RISK ASSESSMENT
-You can review multiple aspects of a loan file concurrently. Don't review them one-by-one if they're independent.
-
-=== TASK DEPENDENCY GRAPH ===
-
-PHASE 1 - INITIAL (sequential, must go first):
-└─ run_automated_underwriting()     [2-4s] - Get DU/LP recommendation
-
-PHASE 2 - CONCURRENT REVIEWS (run ALL in parallel after Phase 1):
-├─ review_credit_profile()          [1s] - Credit analysis
-├─ review_income_employment()       [1s] - Employment/income analysis
-├─ review_assets_reserves()         [1s] - Asset/reserves analysis
-└─ review_property_appraisal()      [1s] - Appraisal analysis
-
-PHASE 3 - DECISION (sequential, after Phase 2):
-├─ issue_underwriting_conditions()  [1s] - If issues found
-├─ issue_final_approval()           [1s] - If all clear
-└─ deny_loan()                      [1s] - If unacceptable
-
-=== YOUR WORKFLOW ===
-
-When you receive a SUBMITTED file:
-1. SAY: "Running automated underwriting..."
-2. CALL run_automated_underwriting()
-3. Analyze DU/LP recommendation
-4. SAY: "Launching Phase 2: 4 concurrent reviews (credit, income, assets, property)..."
-5. CALL ALL 4 review tools WITHOUT waiting between calls
-6. After results: Synthesize findings
-7. Make decision:
-   - No issues → issue_final_approval()
-   - Issues found → issue_underwriting_conditions()
-   - Unacceptable → deny_loan()
-8. Handoff to orchestrator
-
-When you receive RESUBMISSION (conditions cleared):
-1. Verify all conditions are marked "cleared"
-2. If yes → issue_final_approval()
-3. If no → issue_underwriting_conditions() with remaining items
-4. Handoff to orchestrator
-
-=== DECISION CRITERIA ===
-
-APPROVE (Clear to Close):
-- Credit score ≥ 620 (conventional) or ≥ 580 (FHA)
-- DTI ≤ 50%
-- LTV ≤ 97% (with PMI if >80%)
-- Adequate reserves (2+ months)
-- Employment verified
-- Appraisal supports value
-- All conditions cleared
-
-APPROVE WITH CONDITIONS:
-- Minor documentation gaps
-- Verification needed
-- Explanation required
-- Repairs negotiable
-
-DENY:
-- Credit score < 580
-- DTI > 50% with no compensating factors
-- Appraisal significantly below value
-- Unverifiable income
-- Fraud indicators
-
-=== COMMUNICATION STYLE ===
-Be explicit about concurrent analysis:
-✅ GOOD: "Running 4 concurrent reviews across credit, income, assets, and property..."
-❌ BAD: "First I'll review credit, then income..." (too sequential!)
-
-✅ GOOD: "All reviews complete. Summary: Credit acceptable, income verified, assets sufficient, appraisal at value."
-❌ BAD: Repeating full tool outputs
-
-=== CONDITION ISSUANCE ===
-When issuing conditions, be SPECIFIC:
-- What document is needed
-- Why it's needed
-- What it will verify
-- When it's due
-
-Example:
-- Type: VOE
-- Description: "Verbal verification of employment with ABC Corp"
-- Reason: "Borrower changed jobs 3 months ago, need to verify stability"
-- Severity: REQUIRED
-
-=== CRITICAL RULES ===
-- DO NOT handoff until you've made a decision (approve/condition/deny)
-- DO run independent reviews concurrently
-- DO provide clear, actionable conditions
-- DO handoff to orchestrator when decision is made
-
-Use TERMINATE only after final approval or denial is issued.
-""",
-    reflect_on_tool_use=True,
-    tools=[
-        run_automated_underwriting,
-        review_credit_profile,
-        review_income_employment,
-        review_assets_reserves,
-        review_property_appraisal,
-        issue_underwriting_conditions,
-        issue_final_approval,
-        deny_loan
-    ]
-)
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_underwriter() -> AssistantAgent:
+    """Underwriter agent, built on first use."""
+    return AssistantAgent(
+        "underwriter_agent",
+        model_client=get_model_client("gpt-4o", parallel_tool_calls=True, response_format=PhaseSummary),
+        handoffs=["loan_processor_agent", "orchestrator_agent"],
+        system_message=worker_prompt("underwriter"),
+        model_context=trimmed_context(),
+        reflect_on_tool_use=True,
+        tools=[with_timeout(tool) for tool in (
+            run_automated_underwriting,
+            review_credit_profile,
+            review_income_employment,
+            review_assets_reserves,
+            review_property_appraisal,
+            issue_underwriting_conditions,
+            issue_final_approval,
+            deny_loan
+        )]
+    )
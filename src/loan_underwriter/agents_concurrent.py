@@ -3,7 +3,8 @@ Concurrent Multi-Agent Architecture using AutoGen Agent SDK
 
 TRUE concurrent execution using:
 - RoutedAgent for specialized agents
-- asyncio.gather() for parallel task execution
+- A dependency DAG (one asyncio.Event per step) so each task starts as soon
+  as the tasks it depends on have finished
 - Direct message assignment for explicit task delegation
 
 For ONE loan, multiple agents of the SAME type handle DIFFERENT subtasks concurrently.
@@ -11,7 +12,7 @@ For ONE loan, multiple agents of the SAME type handle DIFFERENT subtasks concurr
 
 import asyncio
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.messages import TextMessage
 from autogen_ext.models.openai import OpenAIChatCompletionClient
@@ -31,6 +32,7 @@ from tools_mortgage_broker import (
     query_lender_wellsfargo, query_lender_bankofamerica, query_lender_chase,
     query_lender_quicken, query_lender_usbank
 )
+from task_dag import run_dag
 
 API_KEY = os.environ.get("OPENAI_API_KEY")
 
@@ -355,79 +357,77 @@ async def run_agent_task(agent: AssistantAgent, loan_number: str, task_descripti
     return result
 
 
+# ========== DEPENDENCY DAG ==========
+
+@dataclass(frozen=True, slots=True)
+class LoanStep:
+    """One agent task in the loan workflow and the steps it waits for"""
+    name: str
+    agent: AssistantAgent
+    description: str
+    phase: str
+    dependencies: Tuple[str, ...] = ()
+
+
+PROCESSING_STEPS = ("documents", "credit_report", "appraisal", "flood_certification", "employment")
+SUBMISSION_STEP = ("financial_analysis",)
+REVIEW_STEPS = ("automated_underwriting", "credit_review", "income_review", "asset_review", "property_review")
+
+LOAN_STEPS = [
+    # Phase 0: brokers only read the loan file, nothing waits on them
+    LoanStep("quote_wells_fargo", mortgage_broker_for_wells_fargo, "Get rate quote from Wells Fargo", "phase0"),
+    LoanStep("quote_bank_of_america", mortgage_broker_for_bank_of_america, "Get rate quote from Bank of America", "phase0"),
+    LoanStep("quote_chase", mortgage_broker_for_chase, "Get rate quote from Chase", "phase0"),
+    LoanStep("quote_quicken", mortgage_broker_quicken_loans, "Get rate quote from Quicken Loans", "phase0"),
+    LoanStep("quote_us_bank", mortgage_broker_for_us_bank, "Get rate quote from US Bank", "phase0"),
+
+    # Phase 1: independent processing, then ratios + submission once they are in
+    LoanStep("documents", loan_processor_for_document_verification, "Verify documents", "phase1"),
+    LoanStep("credit_report", loan_processor_for_credit_report, "Order credit report", "phase1"),
+    LoanStep("appraisal", loan_processor_for_appraisal, "Order appraisal", "phase1"),
+    LoanStep("flood_certification", loan_processor_for_flood_certification, "Order flood certification", "phase1"),
+    LoanStep("employment", loan_processor_for_employment_verification, "Verify employment", "phase1"),
+    LoanStep("financial_analysis", loan_processor_for_financial_analysis,
+             "Calculate ratios and submit to underwriting", "phase1", PROCESSING_STEPS),
+
+    # Phase 2: underwriting reviews start once the file is submitted
+    LoanStep("automated_underwriting", underwriter_for_automated_underwriting,
+             "Run automated underwriting", "phase2", SUBMISSION_STEP),
+    LoanStep("credit_review", underwriter_for_credit_review, "Review credit profile", "phase2", SUBMISSION_STEP),
+    LoanStep("income_review", underwriter_for_income_review, "Review income and employment", "phase2", SUBMISSION_STEP),
+    LoanStep("asset_review", underwriter_for_asset_review, "Review assets and reserves", "phase2", SUBMISSION_STEP),
+    LoanStep("property_review", underwriter_for_property_review, "Review property and appraisal", "phase2", SUBMISSION_STEP),
+
+    # Phase 3: final decision
+    LoanStep("decision", decision_maker, "Review all underwriting results and make final decision",
+             "phase3", REVIEW_STEPS),
+]
+
+
 async def process_loan_concurrent(loan_number: str) -> Dict[str, Any]:
     """
     Main coordinator function that processes a loan with TRUE concurrent execution.
 
-    Uses asyncio.gather() to run multiple agents in parallel.
+    Runs LOAN_STEPS as a dependency DAG: brokers overlap with processing, and
+    each task starts the moment the tasks it needs are done instead of
+    waiting for a whole phase to finish.
     """
 
     print(f"\n{'='*80}")
     print(f"🚀 PROCESSING LOAN: {loan_number} (TRUE CONCURRENT EXECUTION)")
     print(f"{'='*80}\n")
 
-    results = {}
-
-    # ========== PHASE 0: ALL 5 Mortgage Brokers Query Lenders CONCURRENTLY ==========
-    print("PHASE 0: Assigning ALL 5 mortgage brokers to get rate quotes CONCURRENTLY")
-    print("-" * 80)
-
-    phase0_results = await asyncio.gather(
-        run_agent_task(mortgage_broker_for_wells_fargo, loan_number, "Get rate quote from Wells Fargo"),
-        run_agent_task(mortgage_broker_for_bank_of_america, loan_number, "Get rate quote from Bank of America"),
-        run_agent_task(mortgage_broker_for_chase, loan_number, "Get rate quote from Chase"),
-        run_agent_task(mortgage_broker_quicken_loans, loan_number, "Get rate quote from Quicken Loans"),
-        run_agent_task(mortgage_broker_for_us_bank, loan_number, "Get rate quote from US Bank"),
+    step_results = await run_dag(
+        LOAN_STEPS,
+        lambda step: run_agent_task(step.agent, loan_number, step.description)
     )
 
-    results['phase0'] = phase0_results
-    print(f"\n✅ PHASE 0 COMPLETE: All 5 brokers got rate quotes concurrently\n")
-
-    # ========== PHASE 1: ALL 6 Loan Processing Tasks CONCURRENTLY ==========
-    print("PHASE 1: Assigning ALL 6 loan processing tasks CONCURRENTLY")
-    print("-" * 80)
-
-    phase1_results = await asyncio.gather(
-        run_agent_task(loan_processor_for_document_verification, loan_number, "Verify documents"),
-        run_agent_task(loan_processor_for_credit_report, loan_number, "Order credit report"),
-        run_agent_task(loan_processor_for_appraisal, loan_number, "Order appraisal"),
-        run_agent_task(loan_processor_for_flood_certification, loan_number, "Order flood certification"),
-        run_agent_task(loan_processor_for_employment_verification, loan_number, "Verify employment"),
-        run_agent_task(loan_processor_for_financial_analysis, loan_number, "Calculate ratios and submit to underwriting"),
-    )
-
-    results['phase1'] = phase1_results
-    print(f"\n✅ PHASE 1 COMPLETE: All 6 processors executed concurrently\n")
-
-    # ========== PHASE 2: ALL 5 Underwriting Tasks CONCURRENTLY ==========
-    print("PHASE 2: Assigning ALL 5 underwriting tasks CONCURRENTLY")
-    print("-" * 80)
-
-    phase2_results = await asyncio.gather(
-        run_agent_task(underwriter_for_automated_underwriting, loan_number, "Run automated underwriting"),
-        run_agent_task(underwriter_for_credit_review, loan_number, "Review credit profile"),
-        run_agent_task(underwriter_for_income_review, loan_number, "Review income and employment"),
-        run_agent_task(underwriter_for_asset_review, loan_number, "Review assets and reserves"),
-        run_agent_task(underwriter_for_property_review, loan_number, "Review property and appraisal"),
-    )
-
-    results['phase2'] = phase2_results
-    print(f"\n✅ PHASE 2 COMPLETE: All 5 underwriters executed concurrently\n")
-
-    # ========== PHASE 3: Final Decision ==========
-    print("PHASE 3: Making final decision")
-    print("-" * 80)
-
-    decision_result = await run_agent_task(
-        decision_maker,
-        loan_number,
-        "Review all underwriting results and make final decision"
-    )
-
-    results['phase3'] = decision_result
-    print(f"\n✅ PHASE 3 COMPLETE: Final decision made\n")
+    results = {}
+    for phase in ("phase0", "phase1", "phase2"):
+        results[phase] = [step_results[step.name] for step in LOAN_STEPS if step.phase == phase]
+    results['phase3'] = step_results["decision"]
 
-    print(f"{'='*80}")
+    print(f"\n{'='*80}")
     print(f"✅ LOAN {loan_number} PROCESSING COMPLETE")
     print(f"{'='*80}\n")
 
@@ -456,4 +456,4 @@ def create_concurrent_team():
     }
 
 
-__all__ = ['create_concurrent_team', 'process_loan_concurrent']
+__all__ = ['create_concurrent_team', 'process_loan_concurrent', 'run_dag', 'LOAN_STEPS']
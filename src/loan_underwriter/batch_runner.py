@@ -0,0 +1,127 @@
+"""
+Offline batch underwriting through the OpenAI Batch API
+
+For non-interactive runs (nightly re-underwriting, portfolio audits) where a
+result within 24h is fine: each loan file becomes one single-turn request
+for a JSON underwriting decision, at half the synchronous price.
+
+Usage:
+    python batch_runner.py                 # every active loan file
+    python batch_runner.py LN-001 LN-002   # selected loan files
+"""
+
+import asyncio
+import json
+import sys
+
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from agents import get_api_key, get_http_client, load_prompt
+from file_manager import file_manager
+
+BATCH_MODEL = "gpt-4o"
+
+# Seconds between batch status checks
+POLL_SECONDS = 30
+
+FINISHED_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def build_batch_line(loan_number: str, loan_json: str) -> dict:
+    """One /v1/chat/completions request for a loan file.
+
+    The live underwriter prompt describes tools and handoffs that a single
+    batch turn does not have, so batch requests use the tool-free
+    underwriter_batch prompt and ask for a JSON decision.
+    """
+    return {
+        "custom_id": loan_number,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": BATCH_MODEL,
+            "messages": [
+                {"role": "system", "content": load_prompt("underwriter_batch")},
+                {"role": "user", "content": f"Underwrite loan {loan_number}:\n\n{loan_json}"},
+            ],
+            "response_format": {"type": "json_object"},
+        },
+    }
+
+
+async def submit_batch(client: AsyncOpenAI, loan_numbers: list[str]) -> str:
+    """Upload the JSONL input and create the batch. Returns the batch ID."""
+    lines = []
+    for loan_number in loan_numbers:
+        loan_file = file_manager.load_loan_file(loan_number)
+        if not loan_file:
+            print(f"⚠️  Loan file {loan_number} not found, skipping")
+            continue
+        lines.append(json.dumps(build_batch_line(loan_number, loan_file.model_dump_json())))
+
+    if not lines:
+        raise ValueError("No loan files to submit")
+
+    batch_file = await client.files.create(
+        file=("loan_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"📤 Submitted batch {batch.id} with {len(lines)} loan files")
+    return batch.id
+
+
+async def wait_for_batch(client: AsyncOpenAI, batch_id: str):
+    """Poll until the batch reaches a final status."""
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        print(f"⏳ Batch {batch_id}: {batch.status}")
+        if batch.status in FINISHED_STATUSES:
+            return batch
+        await asyncio.sleep(POLL_SECONDS)
+
+
+async def download_results(client: AsyncOpenAI, batch) -> dict[str, str]:
+    """Map each loan number to the underwriter's answer."""
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    output = await client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            results[record["custom_id"]] = f"❌ ERROR: {record.get('error') or response}"
+            continue
+        results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return results
+
+
+async def run_batch(loan_numbers: list[str]) -> dict[str, str]:
+    """Submit, wait for and download one batch of loan files."""
+    client = AsyncOpenAI(api_key=get_api_key(), http_client=get_http_client())
+    batch_id = await submit_batch(client, loan_numbers)
+    batch = await wait_for_batch(client, batch_id)
+    return await download_results(client, batch)
+
+
+async def main():
+    loan_numbers = sys.argv[1:] or file_manager.list_loan_files()
+    results = await run_batch(loan_numbers)
+
+    for loan_number, decision in results.items():
+        print("\n" + "="*80)
+        print(f"📋 LOAN #{loan_number}")
+        print("="*80)
+        print(decision)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main())
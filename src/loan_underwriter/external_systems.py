@@ -2,12 +2,14 @@
 Simulated external system integrations with realistic responses and exceptions
 """
 
+import asyncio
 import random
-import uuid
+from functools import wraps
+import secrets
+import sys
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import Dict, List, Optional
-import time
 
 from src.loan_underwriter.models import (
     CreditBureauResponse, CreditReport, CreditTradeline, CreditInquiry,
@@ -16,6 +18,21 @@ from src.loan_underwriter.models import (
 )
 
 
+# Shared generator for all simulators; seed it through seed_simulators() for
+# reproducible runs instead of reseeding the global random module
+_rng = random.Random()
+
+
+def seed_simulators(seed: Optional[int] = None) -> None:
+    """Reseed the simulators' random generator (None reseeds from the OS)"""
+    _rng.seed(seed)
+
+
+# Random price factors are drawn as integer basis points and divided by this,
+# so appraisal values stay exact Decimals without a float/str round trip
+FACTOR_SCALE = Decimal(10000)
+
+
 # ============== EXCEPTION CLASSES ==============
 
 class ExternalSystemException(Exception):
@@ -43,13 +60,61 @@ class InsufficientCreditHistoryException(ExternalSystemException):
     pass
 
 
+# ============== RETRY ==============
+
+# Upper bound of the random jitter added to each backoff, in seconds
+RETRY_JITTER = 0.05
+
+
+def retry_deadline(retries: int = 3, base: float = 0.1, cap: float = 2.0, timeout: float = 5.0) -> float:
+    """Longest a with_retry call can take: every attempt timing out plus every backoff"""
+    backoff = sum(min(cap, base * 2 ** attempt) + RETRY_JITTER for attempt in range(retries - 1))
+    return retries * timeout + backoff
+
+
+def with_retry(retries: int = 3, base: float = 0.1, cap: float = 2.0, timeout: float = 5.0):
+    """
+    Bound and retry a simulator call
+
+    Each attempt gets `timeout` seconds; overrunning it counts as a
+    SystemTimeoutException. Timeouts are retried in place, backing off
+    min(cap, base * 2**attempt) seconds plus a little jitter between
+    attempts; the last timeout is re-raised to the caller.
+
+    This layer owns the per-attempt deadline only. Callers that bound the
+    whole call (agents.TOOL_TIMEOUTS) must allow at least the wrapper's
+    `deadline` attribute (see retry_deadline), or they cancel the retries.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(retries):
+                try:
+                    async with asyncio.timeout(timeout):
+                        return await fn(*args, **kwargs)
+                except (SystemTimeoutException, TimeoutError) as e:
+                    if attempt == retries - 1:
+                        if isinstance(e, SystemTimeoutException):
+                            raise
+                        raise SystemTimeoutException(
+                            f"{fn.__qualname__} did not respond within {timeout}s"
+                        ) from e
+                    await asyncio.sleep(min(cap, base * 2 ** attempt) + _rng.random() * RETRY_JITTER)
+        wrapper.deadline = retry_deadline(retries, base, cap, timeout)
+        return wrapper
+    return decorator
+
+
 # ============== CREDIT BUREAU SIMULATOR ==============
 
 class CreditBureauSimulator:
     """Simulates Experian/Equifax/TransUnion credit bureau APIs"""
 
+    ACCOUNT_TYPES = ("mortgage", "auto", "credit_card", "student_loan", "personal_loan")
+
     @staticmethod
-    def pull_credit_report(
+    @with_retry()
+    async def pull_credit_report(
             borrower_ssn: str,
             borrower_name: str,
             pull_type: str = "hard"
@@ -64,10 +129,10 @@ class CreditBureauSimulator:
         """
 
         # Simulate network delay
-        time.sleep(random.uniform(0.5, 2.0))
+        await asyncio.sleep(_rng.uniform(0.5, 2.0))
 
         # Random exceptions
-        rand = random.random()
+        rand = _rng.random()
         if rand < 0.05:
             raise SystemTimeoutException("Credit bureau timeout - please retry")
         elif rand < 0.07:
@@ -76,38 +141,41 @@ class CreditBureauSimulator:
             raise InsufficientCreditHistoryException("Borrower has insufficient credit history")
 
         # Generate simulated credit report
-        credit_score = random.randint(580, 820)
+        credit_score = _rng.randint(580, 820)
+
+        today = date.today()
 
         # Generate tradelines
-        tradelines = []
-        num_tradelines = random.randint(3, 12)
-
-        for i in range(num_tradelines):
-            account_type = random.choice([
-                "mortgage", "auto", "credit_card", "student_loan", "personal_loan"
-            ])
-            tradelines.append(CreditTradeline(
+        num_tradelines = _rng.randint(3, 12)
+        account_types = _rng.choices(CreditBureauSimulator.ACCOUNT_TYPES, k=num_tradelines)
+        randint = _rng.randint
+        rand = _rng.random
+
+        tradelines = [
+            CreditTradeline(
                 account_type=account_type,
-                creditor_name=f"{account_type.title()} Creditor {i + 1}",
-                account_number=f"****{random.randint(1000, 9999)}",
-                balance=Decimal(str(random.randint(0, 50000))),
-                monthly_payment=Decimal(str(random.randint(50, 1500))),
-                payment_status="current" if random.random() > 0.1 else "30_days_late",
-                opened_date=date.today() - timedelta(days=random.randint(365, 3650)),
-                closed_date=None if random.random() > 0.3 else date.today() - timedelta(days=random.randint(1, 365))
-            ))
+                creditor_name=f"{account_type.title()} Creditor {i}",
+                account_number=f"****{randint(1000, 9999)}",
+                balance=Decimal(randint(0, 50000)),
+                monthly_payment=Decimal(randint(50, 1500)),
+                payment_status="current" if rand() > 0.1 else "30_days_late",
+                opened_date=today - timedelta(days=randint(365, 3650)),
+                closed_date=None if rand() > 0.3 else today - timedelta(days=randint(1, 365))
+            )
+            for i, account_type in enumerate(account_types, start=1)
+        ]
 
         # Generate inquiries (potential red flag if too many)
-        inquiries = []
-        num_inquiries = random.randint(0, 5)
-        for i in range(num_inquiries):
-            inquiry_date = date.today() - timedelta(days=random.randint(1, 180))
-            inquiries.append(CreditInquiry(
-                creditor_name=f"Creditor {i + 1}",
-                inquiry_date=inquiry_date,
-                inquiry_type="hard" if random.random() > 0.3 else "soft",
+        num_inquiries = randint(0, 5)
+        inquiries = [
+            CreditInquiry(
+                creditor_name=f"Creditor {i}",
+                inquiry_date=today - timedelta(days=randint(1, 180)),
+                inquiry_type="hard" if rand() > 0.3 else "soft",
                 explanation_required=num_inquiries > 3  # Red flag if > 3 inquiries
-            ))
+            )
+            for i in range(1, num_inquiries + 1)
+        ]
 
         # Calculate total monthly debt
         total_monthly_debt = sum(t.monthly_payment for t in tradelines if t.closed_date is None)
@@ -115,14 +183,14 @@ class CreditBureauSimulator:
         # Generate derogatory items based on credit score
         derogatory_items = []
         if credit_score < 620:
-            derogatory_items = random.sample([
+            derogatory_items = _rng.sample([
                 "Collection account - Medical $2,500",
                 "30-day late payment in last 12 months",
                 "60-day late payment 18 months ago"
-            ], k=random.randint(1, 2))
+            ], k=_rng.randint(1, 2))
 
         credit_report = CreditReport(
-            report_id=f"CR-{random.randint(100000, 999999)}",
+            report_id=f"CR-{_rng.randint(100000, 999999)}",
             report_date=datetime.now(),
             bureau="TriMerge",
             credit_score=credit_score,
@@ -136,7 +204,7 @@ class CreditBureauSimulator:
         return CreditBureauResponse(
             success=True,
             system_name="CreditBureau",
-            transaction_id=f"TXN-{random.randint(100000, 999999)}",
+            transaction_id=f"TXN-{_rng.randint(100000, 999999)}",
             credit_report=credit_report,
             pull_type=pull_type,
             response_data={
@@ -153,7 +221,8 @@ class AutomatedUnderwritingSimulator:
     """Simulates Fannie Mae DU / Freddie Mac LPA"""
 
     @staticmethod
-    def run_automated_underwriting(loan_file: LoanFile) -> AutomatedUnderwritingResponse:
+    @with_retry()
+    async def run_automated_underwriting(loan_file: LoanFile) -> AutomatedUnderwritingResponse:
         """
         Simulate automated underwriting system (DU/LP)
 
@@ -164,10 +233,10 @@ class AutomatedUnderwritingSimulator:
         """
 
         # Simulate processing delay
-        time.sleep(random.uniform(1.0, 3.0))
+        await asyncio.sleep(_rng.uniform(1.0, 3.0))
 
         # Random timeout
-        if random.random() < 0.03:
+        if _rng.random() < 0.03:
             raise SystemTimeoutException("Automated underwriting system timeout")
 
         metrics = loan_file.financial_metrics
@@ -185,7 +254,7 @@ class AutomatedUnderwritingSimulator:
         elif credit_score >= 740 and metrics.dti_ratio and metrics.dti_ratio <= 43:
             recommendation = "approve"
         else:
-            recommendation = random.choice(["approve", "approve", "refer"])
+            recommendation = _rng.choice(["approve", "approve", "refer"])
 
         # Generate findings
         findings = []
@@ -203,12 +272,14 @@ class AutomatedUnderwritingSimulator:
             findings.append(f"Credit score {credit_score} below preferred threshold")
             required_docs.append("LOE - Explain credit inquiries")
 
-        # Calculate LLPA (Loan Level Price Adjustment)
-        llpa = Decimal("0")
+        # Calculate LLPA (Loan Level Price Adjustment) in basis points,
+        # converted to a percentage Decimal once for the response
+        llpa_bp = 0
         if credit_score < 700:
-            llpa += Decimal("0.5")
+            llpa_bp += 50
         if metrics.ltv_ratio and metrics.ltv_ratio > 80:
-            llpa += Decimal("0.25")
+            llpa_bp += 25
+        llpa = Decimal(llpa_bp) / 100
 
         # Determine reserves required
         reserves_required = 2  # months
@@ -220,7 +291,7 @@ class AutomatedUnderwritingSimulator:
         return AutomatedUnderwritingResponse(
             success=True,
             system_name="AutomatedUnderwriting_DU",
-            transaction_id=f"AU-{random.randint(100000, 999999)}",
+            transaction_id=f"AU-{_rng.randint(100000, 999999)}",
             recommendation=recommendation,
             findings=findings,
             required_documents=required_docs,
@@ -229,7 +300,7 @@ class AutomatedUnderwritingSimulator:
             response_data={
                 "system": "Desktop Underwriter",
                 "version": "11.0",
-                "casefile_id": f"CF{random.randint(1000000, 9999999)}"
+                "casefile_id": f"CF{_rng.randint(1000000, 9999999)}"
             }
         )
 
@@ -249,7 +320,8 @@ class FloodCertificationSimulator:
     }
 
     @staticmethod
-    def check_flood_zone(property_address: str, zip_code: str) -> FloodCertificationResponse:
+    @with_retry()
+    async def check_flood_zone(property_address: str, zip_code: str) -> FloodCertificationResponse:
         """
         Simulate flood certification check
 
@@ -259,20 +331,21 @@ class FloodCertificationSimulator:
         - Climate change risk assessment included
         """
 
-        time.sleep(random.uniform(0.3, 1.0))
+        await asyncio.sleep(_rng.uniform(0.3, 1.0))
 
         # Random timeout
-        if random.random() < 0.02:
+        if _rng.random() < 0.02:
             raise SystemTimeoutException("Flood certification service timeout")
 
         # Check if in high-risk zone
-        in_flood_zone = zip_code in FloodCertificationSimulator.HIGH_RISK_ZONES
+        zone_name = FloodCertificationSimulator.HIGH_RISK_ZONES.get(zip_code)
+        in_flood_zone = zone_name is not None
 
         # Assign flood zone designation
         if in_flood_zone:
-            flood_zone = random.choice(["AE", "VE", "A"])  # High risk zones
+            flood_zone = _rng.choice(["AE", "VE", "A"])  # High risk zones
         else:
-            flood_zone = random.choice(["X", "X", "X", "C"])  # Low risk zones
+            flood_zone = _rng.choice(["X", "X", "X", "C"])  # Low risk zones
 
         # Insurance requirement
         flood_insurance_required = flood_zone in ["A", "AE", "VE", "V"]
@@ -280,14 +353,14 @@ class FloodCertificationSimulator:
         # Future climate risk score (1-10, with 10 being highest risk)
         # This simulates 10-year climate change projection
         if in_flood_zone:
-            future_risk_score = random.randint(7, 10)
+            future_risk_score = _rng.randint(7, 10)
             warnings = [
-                f"Property in {FloodCertificationSimulator.HIGH_RISK_ZONES[zip_code]}",
+                f"Property in {zone_name}",
                 f"Climate models predict increased flooding risk over next 10 years",
                 f"Future risk score: {future_risk_score}/10"
             ]
         else:
-            future_risk_score = random.randint(1, 4)
+            future_risk_score = _rng.randint(1, 4)
             warnings = []
 
         # Add warning if future risk is concerning
@@ -297,15 +370,15 @@ class FloodCertificationSimulator:
         return FloodCertificationResponse(
             success=True,
             system_name="FloodCertification",
-            transaction_id=f"FLOOD-{random.randint(100000, 999999)}",
+            transaction_id=f"FLOOD-{_rng.randint(100000, 999999)}",
             in_flood_zone=in_flood_zone,
             flood_zone_designation=flood_zone,
-            community_number=f"{random.randint(100000, 999999)}",
+            community_number=f"{_rng.randint(100000, 999999)}",
             flood_insurance_required=flood_insurance_required,
-            base_flood_elevation=f"{random.randint(5, 25)} ft" if in_flood_zone else None,
+            base_flood_elevation=f"{_rng.randint(5, 25)} ft" if in_flood_zone else None,
             future_risk_score=future_risk_score,
             response_data={
-                "fema_panel": f"{random.randint(1000, 9999)}{chr(random.randint(65, 90))}",
+                "fema_panel": f"{_rng.randint(1000, 9999)}{chr(_rng.randint(65, 90))}",
                 "certification_date": datetime.now().isoformat()
             },
             warnings=warnings
@@ -385,7 +458,7 @@ class AppraisalManagementSimulator:
     #             )
     #
     #             appraisal_doc = Document(
-    #                 document_id=f"DOC-{uuid.uuid4().hex[:8].upper()}",
+    #                 document_id=f"DOC-{secrets.token_hex(4).upper()}",
     #                 document_type=DocumentType.APPRAISAL,
     #                 status=DocumentStatus.REQUESTED,
     #                 metadata={
@@ -422,7 +495,8 @@ class AppraisalManagementSimulator:
     #
 
     @staticmethod
-    def order_appraisal(loan_number: str,  # ← Accept parameters
+    @with_retry()
+    async def order_appraisal(loan_number: str,  # ← Accept parameters
                         property_address: str,
                         purchase_price) -> ExternalSystemResponse:
         """
@@ -430,12 +504,11 @@ class AppraisalManagementSimulator:
         Returns simulated response - NO file operations!
         """
         # Simulate delay
-        import time
-        time.sleep(random.uniform(1.0, 2.0))
+        await asyncio.sleep(_rng.uniform(1.0, 2.0))
 
         # Generate fake data
-        order_id = f"APR-{random.randint(100000, 999999)}"
-        transaction_id = f"TXN-{random.randint(100000, 999999)}"
+        order_id = f"APR-{_rng.randint(100000, 999999)}"
+        transaction_id = f"TXN-{_rng.randint(100000, 999999)}"
 
         response_data = {
             'order_id': order_id,
@@ -444,7 +517,7 @@ class AppraisalManagementSimulator:
             'purchase_price': float(purchase_price),  # ← USE the parameters
             'fee': 500.00,
             'estimated_completion': (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d'),
-            'appraiser_assigned': random.choice([True, False])
+            'appraiser_assigned': _rng.choice([True, False])
         }
 
         # Return simulated response
@@ -469,13 +542,13 @@ class AppraisalManagementSimulator:
         """
 
         # 15% chance appraisal comes in low
-        if random.random() < 0.15:
+        if _rng.random() < 0.15:
             # 5-10% below purchase price
-            appraised_value = purchase_price * Decimal(str(random.uniform(0.90, 0.95)))
+            appraised_value = purchase_price * Decimal(_rng.randint(9000, 9500)) / FACTOR_SCALE
             issues = ["Appraised value below purchase price - renegotiation required"]
         else:
             # At or slightly above purchase price
-            appraised_value = purchase_price * Decimal(str(random.uniform(0.98, 1.02)))
+            appraised_value = purchase_price * Decimal(_rng.randint(9800, 10200)) / FACTOR_SCALE
             issues = []
 
         # Add condition-based issues
@@ -490,16 +563,18 @@ class AppraisalManagementSimulator:
             repairs_required = []
             estimated_repair_cost = Decimal("0")
 
-        # Generate comparable sales
-        comparable_sales = []
-        for i in range(3):
-            comp_price = float(purchase_price) * random.uniform(0.95, 1.05)
-            comparable_sales.append({
-                "address": f"{random.randint(100, 999)} Comparable St #{i + 1}",
-                "sale_price": round(comp_price, 2),
-                "sale_date": (date.today() - timedelta(days=random.randint(30, 180))).isoformat(),
-                "proximity": f"{random.uniform(0.1, 2.0):.1f} miles"
-            })
+        # Generate comparable sales (reported as floats, so price them in floats)
+        price = float(purchase_price)
+        today = date.today()
+        comparable_sales = [
+            {
+                "address": f"{_rng.randint(100, 999)} Comparable St #{i}",
+                "sale_price": round(price * _rng.randint(9500, 10500) / 10000, 2),
+                "sale_date": (today - timedelta(days=_rng.randint(30, 180))).isoformat(),
+                "proximity": f"{_rng.uniform(0.1, 2.0):.1f} miles"
+            }
+            for i in range(1, 4)
+        ]
 
         return {
             "appraised_value": float(appraised_value),
@@ -519,23 +594,23 @@ class TitleCompanySimulator:
     """Simulates title search and reports"""
 
     @staticmethod
-    def order_title_search(property_address: str) -> ExternalSystemResponse:
+    async def order_title_search(property_address: str) -> ExternalSystemResponse:
         """Order title search"""
 
-        time.sleep(random.uniform(0.5, 1.0))
+        await asyncio.sleep(_rng.uniform(0.5, 1.0))
 
         # 2% chance of delay
         warnings = []
-        if random.random() < 0.02:
+        if _rng.random() < 0.02:
             warnings.append("Complex ownership history - search may take 5-7 business days")
 
         return ExternalSystemResponse(
             success=True,
             system_name="TitleCompany",
-            transaction_id=f"TITLE-{random.randint(100000, 999999)}",
+            transaction_id=f"TITLE-{_rng.randint(100000, 999999)}",
             response_data={
-                "order_id": f"TS-{random.randint(100000, 999999)}",
-                "estimated_completion": (datetime.now() + timedelta(days=random.randint(3, 7))).date().isoformat()
+                "order_id": f"TS-{_rng.randint(100000, 999999)}",
+                "estimated_completion": (datetime.now() + timedelta(days=_rng.randint(3, 7))).date().isoformat()
             },
             warnings=warnings
         )
@@ -549,9 +624,9 @@ class TitleCompanySimulator:
         """
 
         # 5% chance of liens or exceptions
-        if random.random() < 0.05:
+        if _rng.random() < 0.05:
             is_clear = False
-            liens = [random.choice([
+            liens = [_rng.choice([
                 "Unpaid property tax lien - $3,500",
                 "Mechanic's lien from contractor - $8,000",
                 "HOA lien for unpaid fees - $1,200"
@@ -576,7 +651,8 @@ class IRSTranscriptSimulator:
     """Simulates IRS 4506-T tax transcript service"""
 
     @staticmethod
-    def request_tax_transcript(
+    @with_retry()
+    async def request_tax_transcript(
             borrower_ssn: str,
             tax_years: List[int]
     ) -> ExternalSystemResponse:
@@ -588,9 +664,9 @@ class IRSTranscriptSimulator:
         - 2% chance of transcript not found
         """
 
-        time.sleep(random.uniform(1.0, 2.0))
+        await asyncio.sleep(_rng.uniform(1.0, 2.0))
 
-        rand = random.random()
+        rand = _rng.random()
         if rand < 0.10:
             raise SystemTimeoutException("IRS system delay - transcripts may take 10 business days")
         elif rand < 0.12:
@@ -601,16 +677,16 @@ class IRSTranscriptSimulator:
         for year in tax_years:
             transcripts.append({
                 "tax_year": year,
-                "agi": float(random.randint(50000, 150000)),
-                "wages": float(random.randint(50000, 140000)),
-                "filing_status": random.choice(["Single", "Married Filing Jointly"]),
-                "dependents": random.randint(0, 3)
+                "agi": float(_rng.randint(50000, 150000)),
+                "wages": float(_rng.randint(50000, 140000)),
+                "filing_status": _rng.choice(["Single", "Married Filing Jointly"]),
+                "dependents": _rng.randint(0, 3)
             })
 
         return ExternalSystemResponse(
             success=True,
             system_name="IRS_4506T",
-            transaction_id=f"IRS-{random.randint(100000, 999999)}",
+            transaction_id=f"IRS-{_rng.randint(100000, 999999)}",
             response_data={
                 "transcripts": transcripts,
                 "verification_date": datetime.now().isoformat()
@@ -624,7 +700,8 @@ class EmploymentVerificationSimulator:
     """Simulates employment verification service"""
 
     @staticmethod
-    def verify_employment(employer_name: str,
+    @with_retry()
+    async def verify_employment(employer_name: str,
                           employee_name: str,
                           reported_income) -> ExternalSystemResponse:
         """
@@ -633,20 +710,20 @@ class EmploymentVerificationSimulator:
         """
 
         # Simulate processing delay
-        time.sleep(random.uniform(1.0, 3.0))
+        await asyncio.sleep(_rng.uniform(1.0, 3.0))
 
         # Generate fake response
-        transaction_id = f"VOE-{random.randint(100000, 999999)}"
+        transaction_id = f"VOE-{_rng.randint(100000, 999999)}"
 
         # Simulate verification with slight income variance
-        verified_income = float(reported_income) * random.uniform(0.95, 1.05)
+        verified_income = float(reported_income) * _rng.uniform(0.95, 1.05)
 
         response_data = {
             'employer_name': employer_name,
             'employee_name': employee_name,
             'employment_status': 'active',
-            'hire_date': (datetime.now() - timedelta(days=random.randint(365, 2000))).strftime('%Y-%m-%d'),
-            'employment_type': random.choice(['full_time', 'part_time', 'contract']),
+            'hire_date': (datetime.now() - timedelta(days=_rng.randint(365, 2000))).strftime('%Y-%m-%d'),
+            'employment_type': _rng.choice(['full_time', 'part_time', 'contract']),
             'reported_income': float(reported_income),
             'verified_income': round(verified_income, 2),
             'position': 'Employee'
@@ -664,4 +741,9 @@ class EmploymentVerificationSimulator:
             transaction_id=transaction_id,
             response_data=response_data,
             warnings=warnings
-        )
\ No newline at end of file
+        )
+
+
+# Map the flat module path to the same module so every simulator shares one _rng
+sys.modules.setdefault("src.loan_underwriter.external_systems", sys.modules[__name__])
+sys.modules.setdefault("external_systems", sys.modules[__name__])
@@ -2,22 +2,32 @@
 File manager with concurrent safety, storage optimization, and memory management
 """
 
+import hashlib
 import json
 import os
 import gzip
-import shutil
 import time
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict
-from decimal import Decimal
+from typing import Optional, Dict, List, Tuple, Type, TypeVar
+from collections import OrderedDict
 import asyncio
 import threading
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import BaseModel
 
 from src.loan_underwriter.models import LoanFile
 
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+def _load_one(file_path: Path) -> LoanFile:
+    """Parse one loan file (module level so worker processes can pickle it)"""
+    return LoanFile.model_validate_json(file_path.read_bytes())
+
 
 class LoanFileManager:
     """Thread-safe loan file manager with storage optimization"""
@@ -26,6 +36,12 @@ class LoanFileManager:
     MAX_FILE_SIZE_MB = 10
     MAX_TOTAL_STORAGE_GB = 5
     BACKUP_RETENTION_DAYS = 30
+    MAX_CACHED_FILES = 128
+    # How long an external system's answer can be replayed instead of re-queried
+    RESPONSE_CACHE_TTL = {
+        "credit": timedelta(hours=24),
+        "flood": timedelta(days=90),
+    }
 
     def __init__(self, base_directory: str = "./loan_files"):
         self.base_directory = Path(base_directory)
@@ -34,15 +50,19 @@ class LoanFileManager:
         self.active_dir = self.base_directory / "active"
         self.archive_dir = self.base_directory / "archive"
         self.backup_dir = self.base_directory / "backups"
+        self.response_dir = self.base_directory / "responses"
 
         self.active_dir.mkdir(exist_ok=True)
         self.archive_dir.mkdir(exist_ok=True)
         self.backup_dir.mkdir(exist_ok=True)
+        self.response_dir.mkdir(exist_ok=True)
 
         self._locks: Dict[str, asyncio.Lock] = {}
         self._lock_manager = threading.Lock()
         self._write_counts: Dict[str, int] = {}
         self._last_cleanup = datetime.now()
+        # path -> (mtime_ns, parsed LoanFile), least recently used first
+        self._cache: "OrderedDict[Path, Tuple[int, LoanFile]]" = OrderedDict()
 
     def _get_lock(self, loan_number: str) -> asyncio.Lock:
         with self._lock_manager:
@@ -56,15 +76,6 @@ class LoanFileManager:
         async with lock:
             yield
 
-    def _custom_encoder(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        elif isinstance(obj, datetime):
-            return obj.isoformat()
-        elif hasattr(obj, 'dict'):
-            return obj.dict()
-        return str(obj)
-
     def _get_file_path(self, loan_number: str, archived: bool = False) -> Path:
         directory = self.archive_dir if archived else self.active_dir
         return directory / f"{loan_number}.json"
@@ -76,15 +87,14 @@ class LoanFileManager:
 
             archive_path = self.archive_dir / f"{loan_file.loan_info.loan_number}_audit_archive.json.gz"
 
-            existing_archive = []
-            if archive_path.exists():
-                with gzip.open(archive_path, 'rt') as f:
-                    existing_archive = json.load(f)
+            try:
+                existing_archive = json.loads(gzip.decompress(archive_path.read_bytes()))
+            except FileNotFoundError:
+                existing_archive = []
 
-            existing_archive.extend([e.dict() for e in old_entries])
+            existing_archive.extend([e.model_dump(mode="json") for e in old_entries])
 
-            with gzip.open(archive_path, 'wt') as f:
-                json.dump(existing_archive, f, default=self._custom_encoder)
+            archive_path.write_bytes(gzip.compress(json.dumps(existing_archive).encode()))
 
     def _check_file_size(self, file_path: Path) -> None:
         if file_path.exists():
@@ -100,17 +110,14 @@ class LoanFileManager:
             print(f"⚠️  WARNING: Total storage is {total_gb:.2f}GB")
 
     def _create_backup(self, loan_number: str) -> Optional[str]:
-        source = self._get_file_path(loan_number)
-
-        if not source.exists():
+        try:
+            data = self._get_file_path(loan_number).read_bytes()
+        except FileNotFoundError:
             return None
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = self.backup_dir / f"{loan_number}_backup_{timestamp}.json.gz"
-
-        with open(source, 'rb') as f_in:
-            with gzip.open(backup_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        backup_path.write_bytes(gzip.compress(data))
 
         return str(backup_path)
 
@@ -122,19 +129,36 @@ class LoanFileManager:
             if file_time < cutoff_date:
                 backup_file.unlink()
 
-    def save_loan_file(self, loan_file: LoanFile) -> str:
+    def _cleanup_expired_responses(self) -> None:
+        now = datetime.now()
+        for kind, ttl in self.RESPONSE_CACHE_TTL.items():
+            for response_file in (self.response_dir / kind).glob("*.json"):
+                if now - datetime.fromtimestamp(response_file.stat().st_mtime) > ttl:
+                    response_file.unlink(missing_ok=True)
+
+    def save_loan_file(self, loan_file: LoanFile, durable: bool = False) -> str:
         loan_number = loan_file.loan_info.loan_number
         file_path = self._get_file_path(loan_number)
 
         self._rotate_audit_trail(loan_file)
 
-        if file_path.exists():
-            self._create_backup(loan_number)
-
-        loan_data = json.loads(loan_file.model_dump_json())
-
-        with open(file_path, 'w') as f:
-            json.dump(loan_data, f, indent=2, default=self._custom_encoder)
+        self._create_backup(loan_number)
+
+        self._cache.pop(file_path, None)
+        # Serialize first, then write a temp file and swap it in, so neither a bad
+        # model nor a crash mid-write can leave a torn loan file
+        payload = loan_file.model_dump_json(indent=2).encode()
+        tmp_path = file_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
         self._write_counts[loan_number] = self._write_counts.get(loan_number, 0) + 1
         elapsed = time.perf_counter()
@@ -147,28 +171,70 @@ class LoanFileManager:
 
         if (datetime.now() - self._last_cleanup).total_seconds() > 3600:
             self._cleanup_old_backups()
+            self._cleanup_expired_responses()
             self._check_total_storage()
             self._last_cleanup = datetime.now()
 
         return str(file_path)
 
     def load_loan_file(self, loan_number: str) -> Optional[LoanFile]:
-        file_path = self._get_file_path(loan_number)
-
-        if not file_path.exists():
-            file_path = self._get_file_path(loan_number, archived=True)
-            if not file_path.exists():
-                return None
+        for archived in (False, True):
+            file_path = self._get_file_path(loan_number, archived=archived)
+            try:
+                mtime = file_path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+
+            # Callers mutate what they load, so hand out copies of the cached parse
+            cached = self._cache.get(file_path)
+            if cached and cached[0] == mtime:
+                self._cache.move_to_end(file_path)
+                return cached[1].model_copy(deep=True)
+
+            loan_file = LoanFile.model_validate_json(file_path.read_bytes())
+            self._cache[file_path] = (mtime, loan_file.model_copy(deep=True))
+            if len(self._cache) > self.MAX_CACHED_FILES:
+                self._cache.popitem(last=False)
+            return loan_file
+
+        return None
+
+    def _response_cache_path(self, kind: str, key: str) -> Path:
+        # Keys carry SSNs and addresses, so only their hash reaches the file name
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.response_dir / kind / f"{digest}.json"
+
+    def load_cached_response(self, kind: str, key: str, model: Type[ResponseT]) -> Optional[ResponseT]:
+        """Replay a stored external system response if it is still within its TTL"""
+        path = self._response_cache_path(kind, key)
+        try:
+            age = datetime.now() - datetime.fromtimestamp(path.stat().st_mtime)
+        except FileNotFoundError:
+            return None
 
-        with open(file_path, 'r') as f:
-            loan_data = json.load(f)
+        if age > self.RESPONSE_CACHE_TTL[kind]:
+            path.unlink(missing_ok=True)
+            return None
+        return model.model_validate_json(path.read_bytes())
 
-        loan_file = LoanFile(**loan_data)
-        return loan_file
+    def store_cached_response(self, kind: str, key: str, response: BaseModel) -> None:
+        """Keep the raw external system response so retries and re-runs can replay it"""
+        path = self._response_cache_path(kind, key)
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(response.model_dump_json())
 
     def list_loan_files(self) -> list:
         return [f.stem for f in self.active_dir.glob("*.json")]
 
+    def load_all(self) -> List[LoanFile]:
+        """Load every active loan file, parsing across a process pool (reindex/migration)"""
+        file_paths = list(self.active_dir.glob("*.json"))
+        if not file_paths:
+            return []
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return list(executor.map(_load_one, file_paths, chunksize=8))
+
     def get_storage_stats(self) -> Dict:
         stats = {
             "active_files": len(list(self.active_dir.glob("*.json"))),
@@ -4,13 +4,19 @@ Main orchestration with storage monitoring
 
 import asyncio
 import os
-from autogen_agentchat.conditions import HandoffTermination, TextMentionTermination
+from functools import lru_cache
+from autogen_agentchat.conditions import (
+    HandoffTermination, MaxMessageTermination, TextMentionTermination
+)
 from autogen_agentchat.messages import HandoffMessage
 from autogen_agentchat.teams import Swarm
 from autogen_agentchat.ui import Console
 from dotenv import load_dotenv
 
-from agents import orchestrator_agent, loan_processor_agent, underwriter_agent
+from agents import (
+    get_orchestrator, get_loan_processor, get_underwriter,
+    prewarm_connections, close_http_client
+)
 from file_manager import file_manager  # Import singleton instance
 from scenarios import (
     create_scenario_clean_approval,
@@ -26,14 +32,25 @@ load_dotenv()
 if not os.environ.get("OPENAI_API_KEY"):
     raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-termination = HandoffTermination(target="user") | TextMentionTermination("TERMINATE")
+# Hard cap on a runaway workflow: about 15 handoffs, each a tool summary plus a handoff message
+MAX_WORKFLOW_MESSAGES = 30
 
-team = Swarm(
-    [orchestrator_agent, loan_processor_agent, underwriter_agent],
-    termination_condition=termination,
-    max_turns=50
+termination = (
+    HandoffTermination(target="user")
+    | TextMentionTermination("TERMINATE")
+    | MaxMessageTermination(MAX_WORKFLOW_MESSAGES)
 )
 
+@lru_cache(maxsize=None)
+def get_team() -> Swarm:
+    """The workflow Swarm, built on first use so importing this module creates no agents."""
+    # The loan processor goes first so a new file starts without a routing hop
+    return Swarm(
+        [get_loan_processor(), get_underwriter(), get_orchestrator()],
+        termination_condition=termination,
+        max_turns=50
+    )
+
 
 def display_menu():
     print("\n" + "="*80)
@@ -46,6 +63,7 @@ def display_menu():
     print("  3. Low Appraisal (Value Issue)")
     print("  4. High Risk Denial (Poor Credit/High DTI)")
     print("  5. Flood Zone High Risk (Climate Impact)")
+    print("  6. All Scenarios as One Batch")
     print("  9. Show Storage Statistics")
     print("  0. Exit")
     print("="*80)
@@ -69,29 +87,14 @@ def create_scenario(choice: int) -> str:
         return None
 
 
-async def run_workflow(loan_number: str) -> None:
-    """Run the complete underwriting workflow"""
-
-    print("\n" + "="*80)
-    print(f"🚀 STARTING WORKFLOW FOR LOAN #{loan_number}")
-    print("="*80)
-    print("\n📊 WORKFLOW STAGES:")
-    print("  1. Orchestrator routes to Loan Processor")
-    print("  2. Loan Processor: Concurrent document collection & verification")
-    print("  3. Loan Processor: Calculate ratios → Submit to underwriting")
-    print("  4. Orchestrator routes to Underwriter")
-    print("  5. Underwriter: Automated UW → Concurrent manual reviews")
-    print("  6. Underwriter: Issue decision (Approve/Condition/Deny)")
-    print("  7. If conditions: Route back to LP → Clear → Route to UW")
-    print("  8. Final approval or denial → TERMINATE")
-    print("\n" + "="*80 + "\n")
-
-    initial_task = f"""
+def build_loan_task(loan_number: str) -> str:
+    """The task that starts one loan file's workflow"""
+    return f"""
 New loan application received and ready for processing.
 
 Loan Number: {loan_number}
 
-The loan file has been created and saved. Please route this to the appropriate agent to begin processing.
+The loan file has been created and saved.
 
 All loan details are stored in the file system at: ./loan_files/active/{loan_number}.json
 
@@ -100,12 +103,30 @@ The loan processor should:
 2. Order credit report, appraisal, flood cert, and verify employment (ALL CONCURRENTLY)
 3. Calculate financial ratios
 4. Submit to underwriting
-
-Route to loan_processor_agent to begin.
 """
 
+
+async def run_workflow(loan_number: str) -> None:
+    """Run the complete underwriting workflow"""
+
+    print("\n" + "="*80)
+    print(f"🚀 STARTING WORKFLOW FOR LOAN #{loan_number}")
+    print("="*80)
+    print("\n📊 WORKFLOW STAGES:")
+    print("  1. Loan Processor: Concurrent document collection & verification")
+    print("  2. Loan Processor: Calculate ratios → Submit to underwriting")
+    print("  3. Loan Processor hands off to Underwriter")
+    print("  4. Underwriter: Automated UW → Concurrent manual reviews")
+    print("  5. Underwriter: Issue decision (Approve/Condition/Deny)")
+    print("  6. If conditions: Hand back to LP → Clear → Hand off to UW")
+    print("  7. Final approval or denial → TERMINATE")
+    print("  (Orchestrator steps in only when a file cannot be routed)")
+    print("\n" + "="*80 + "\n")
+
+    team = get_team()
+
     try:
-        task_result = await Console(team.run_stream(task=initial_task))
+        task_result = await Console(team.run_stream(task=build_loan_task(loan_number)))
         last_message = task_result.messages[-1]
 
         while isinstance(last_message, HandoffMessage) and last_message.target == "user":
@@ -142,9 +163,49 @@ Route to loan_processor_agent to begin.
         traceback.print_exc()
 
 
+async def run_batch_workflow(loan_numbers: list[str]) -> None:
+    """Run several loan files back to back on the shared team.
+
+    Each loan is its own task, so a decision (and the orchestrator's
+    TERMINATE) on one file never ends the others, and each run keeps the
+    single-loan message cap. The agents, model clients and HTTP pool are
+    built once, and the identical system prompts stay in the provider's
+    prompt cache from one loan to the next.
+    """
+    team = get_team()
+
+    print("\n" + "="*80)
+    print(f"🚀 STARTING BATCH WORKFLOW FOR {len(loan_numbers)} LOANS")
+    print("="*80 + "\n")
+
+    for i, loan_number in enumerate(loan_numbers, 1):
+        print(f"\n📂 Loan {i}/{len(loan_numbers)}: #{loan_number}\n")
+        try:
+            await team.reset()
+            await Console(team.run_stream(task=build_loan_task(loan_number)))
+        except Exception as e:
+            print(f"\n❌ ERROR during workflow execution for loan {loan_number}:")
+            print(f"   {str(e)}")
+            import traceback
+            traceback.print_exc()
+
+    print("\n" + "="*80)
+    print("✅ BATCH WORKFLOW COMPLETED")
+    print("="*80)
+    for loan_number in loan_numbers:
+        loan_file = file_manager.load_loan_file(loan_number)
+        status = loan_file.status if loan_file else "missing"
+        print(f"  {loan_number}: {status}")
+
+    file_manager.print_storage_stats()
+
+
 async def main():
     """Main entry point"""
 
+    # The menu blocks the event loop on input(), so warm up before showing it
+    await prewarm_connections()
+
     while True:
         display_menu()
 
@@ -159,6 +220,11 @@ async def main():
                 file_manager.print_storage_stats()
                 continue
 
+            if choice == 6:
+                loan_numbers = [create_scenario(scenario) for scenario in range(1, 6)]
+                await run_batch_workflow(loan_numbers)
+                continue
+
             loan_number = create_scenario(choice)
 
             if loan_number:
@@ -171,7 +237,7 @@ async def main():
                         print("\n👋 Exiting... Thank you!")
                         break
             else:
-                print("\n❌ Invalid choice. Please select 1-5 or 9.")
+                print("\n❌ Invalid choice. Please select 1-6 or 9.")
 
         except ValueError:
             print("\n❌ Invalid input. Please enter a number.")
@@ -183,6 +249,8 @@ async def main():
             import traceback
             traceback.print_exc()
 
+    await close_http_client()
+
 
 if __name__ == "__main__":
     print("""
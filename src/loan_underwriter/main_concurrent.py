@@ -111,16 +111,16 @@ async def run_workflow(loan_number: str):
     print("="*80)
     print("\nExpected Workflow:")
     print("-" * 80)
-    print("PHASE 0: asyncio.gather() runs ALL 5 mortgage brokers IN PARALLEL")
-    print("  → All 5 execute simultaneously (true concurrency)")
+    print("PHASE 0: ALL 5 mortgage brokers start immediately")
+    print("  → Run alongside the loan processors (nothing depends on them)")
     print("")
-    print("PHASE 1: asyncio.gather() runs ALL 6 loan processors IN PARALLEL")
-    print("  → All 6 execute simultaneously (true concurrency)")
+    print("PHASE 1: 5 loan processors start immediately")
+    print("  → Ratios + submission start as soon as those 5 are done")
     print("")
-    print("PHASE 2: asyncio.gather() runs ALL 5 underwriters IN PARALLEL")
+    print("PHASE 2: ALL 5 underwriters start once the loan is submitted")
     print("  → All 5 execute simultaneously (true concurrency)")
     print("")
-    print("PHASE 3: decision_maker makes final decision")
+    print("PHASE 3: decision_maker starts once all 5 reviews are done")
     print("\n" + "="*80 + "\n")
 
     try:
@@ -138,9 +138,9 @@ async def run_workflow(loan_number: str):
         print(f"\n📝 Total file writes for this loan: {write_count}")
 
         print(f"\n🔥 TRUE Concurrent Execution:")
-        print(f"   • Phase 0: ALL 5 brokers ran IN PARALLEL (asyncio.gather)")
-        print(f"   • Phase 1: ALL 6 processors ran IN PARALLEL (asyncio.gather)")
-        print(f"   • Phase 2: ALL 5 underwriters ran IN PARALLEL (asyncio.gather)")
+        print(f"   • Brokers ran alongside the loan processors")
+        print(f"   • Each task started as soon as its dependencies finished")
+        print(f"   • Phase 2: ALL 5 underwriters ran IN PARALLEL")
         print(f"   • All on the SAME loan: {loan_number}")
         print(f"   • Actual parallelism achieved!")
 
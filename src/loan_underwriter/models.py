@@ -418,8 +418,9 @@ class LoanFile(BaseModel):
                         status_before: Optional[str] = None,
                         status_after: Optional[str] = None):
         """Add audit trail entry"""
+        now = datetime.now()
         entry = AuditTrail(
-            timestamp=datetime.now(),
+            timestamp=now,
             actor=actor,
             action=action,
             details=details,
@@ -427,7 +428,14 @@ class LoanFile(BaseModel):
             status_after=status_after
         )
         self.audit_trail.append(entry)
-        self.last_updated = datetime.now()
+        self.last_updated = now
+
+    def documents_by_type(self) -> Dict[str, List["Document"]]:
+        """Index documents by type in one pass (a snapshot: rebuild after appending)"""
+        by_type: Dict[str, List[Document]] = {}
+        for doc in self.documents:
+            by_type.setdefault(doc.document_type, []).append(doc)
+        return by_type
 
     def update_status(self, new_status: LoanStatus, actor: str, reason: str):
         """Update loan status with audit trail"""
@@ -482,3 +490,12 @@ class FloodCertificationResponse(ExternalSystemResponse):
     flood_insurance_required: bool
     base_flood_elevation: Optional[str] = None
     future_risk_score: Optional[int] = None  # 1-10, climate change risk
+
+
+# ============== AGENT REPLIES ==============
+
+class PhaseSummary(BaseModel):
+    """Structured reply a worker agent ends its turn with"""
+    status: str = Field(..., description="Stage reached, e.g. SUBMITTED, CONDITIONS_ISSUED, CONDITIONS_CLEARED, APPROVED, DENIED, BLOCKED")
+    findings: List[str] = Field(..., description="Key results, one short line each")
+    next_action: str = Field(..., description="Next step; TERMINATE once final approval or denial is issued")
@@ -0,0 +1,57 @@
+"""
+Keyword routing for the orchestrator: maps a worker's latest report to the
+next agent without a model call (kept free of autogen so it can be tested alone)
+"""
+
+import re
+
+from pydantic import ValidationError
+
+from models import PhaseSummary
+
+# Ending the workflow instead of handing off
+ROUTE_TERMINATE = "TERMINATE"
+
+# PhaseSummary.status -> next agent. BLOCKED and unknown statuses map to None
+# so the model handles them.
+STATUS_ROUTES = {
+    "SUBMITTED": "underwriter_agent",
+    "CONDITIONS_ISSUED": "loan_processor_agent",
+    "CONDITIONS_CLEARED": "underwriter_agent",
+    "APPROVED": ROUTE_TERMINATE,
+    "CLEAR_TO_CLOSE": ROUTE_TERMINATE,
+    "DENIED": ROUTE_TERMINATE,
+    "BLOCKED": None,
+}
+
+# Fallback for plain-text reports (e.g. tool output forwarded as-is). Each pattern
+# only matches at the start of a line, after any emoji or bullet, so words inside
+# findings ("Documents: 5 approved", "No timeout issues") do not route.
+# First match wins; problem reports are checked first and map to None.
+ROUTES = (
+    (re.compile(r"^\W*(?:(?:submission\s+)?blocked|error|timeout|unable to proceed)\b", re.I | re.M), None),
+    (re.compile(r"^\W*(?:clear to close|approved|denied)\b", re.I | re.M), ROUTE_TERMINATE),
+    (re.compile(r"^\W*(?:conditions?[ _](?:issued|pending)|conditional[ _]approval)\b", re.I | re.M),
+     "loan_processor_agent"),
+    (re.compile(r"^\W*(?:all\s+)?conditions?[ _]cleared\b|^\W*resubmit", re.I | re.M), "underwriter_agent"),
+    (re.compile(r"^\W*(?:file\s+)?submitted\b", re.I | re.M), "underwriter_agent"),
+)
+
+
+def route_message(text: str) -> str | None:
+    """Next agent (or ROUTE_TERMINATE) for a recognizable workflow state, else None.
+
+    PhaseSummary replies route on their status alone; the regexes only see
+    messages that are not JSON.
+    """
+    try:
+        summary = PhaseSummary.model_validate_json(text)
+    except ValidationError as e:
+        if any(error["type"] != "json_invalid" for error in e.errors()):
+            return None  # JSON, but not a PhaseSummary
+        return next((target for pattern, target in ROUTES if pattern.search(text)), None)
+
+    return STATUS_ROUTES.get(summary.status.strip().upper().replace(" ", "_"))
+
+
+__all__ = ["ROUTE_TERMINATE", "STATUS_ROUTES", "ROUTES", "route_message"]
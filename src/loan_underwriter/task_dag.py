@@ -0,0 +1,64 @@
+"""
+Dependency DAG runner for the concurrent loan workflow
+
+Kept free of autogen so the scheduling can be tested with stub steps.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Sequence
+
+
+def _check_dag(steps: Sequence[Any]) -> None:
+    """Reject unknown dependencies and cycles, which would otherwise wait forever"""
+    names = {step.name for step in steps}
+    for step in steps:
+        unknown = [dep for dep in step.dependencies if dep not in names]
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown step(s): {', '.join(unknown)}")
+
+    remaining = {step.name: set(step.dependencies) for step in steps}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between steps: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def run_dag(steps: Sequence[Any], run_step: Callable[[Any], Awaitable[Any]]) -> Dict[str, Any]:
+    """
+    Run every step as soon as its own dependencies are done.
+
+    Steps need a `name` and a tuple of `dependencies` (step names);
+    run_step(step) does the work. Each step gets an asyncio.Event that is
+    set when it finishes, whether it succeeded or not. A failed step stores
+    its exception as its result and every step depending on it is skipped
+    with a RuntimeError.
+    """
+    _check_dag(steps)
+
+    events = {step.name: asyncio.Event() for step in steps}
+    results: Dict[str, Any] = {}
+
+    async def _run(step) -> None:
+        try:
+            await asyncio.gather(*(events[dep].wait() for dep in step.dependencies))
+            failed = [dep for dep in step.dependencies if isinstance(results[dep], Exception)]
+            if failed:
+                results[step.name] = RuntimeError(f"Skipped: {', '.join(failed)} failed")
+                print(f"  ⏭️  {step.name} skipped ({', '.join(failed)} failed)")
+            else:
+                results[step.name] = await run_step(step)
+        except Exception as e:
+            results[step.name] = e
+            print(f"  ❌ {step.name} failed: {e}")
+        finally:
+            events[step.name].set()
+
+    await asyncio.gather(*(_run(step) for step in steps))
+    return results
+
+
+__all__ = ["run_dag"]
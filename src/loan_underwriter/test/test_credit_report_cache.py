@@ -0,0 +1,74 @@
+"""
+Reuse policy for stored credit pulls (order_credit_report): replayed for the
+same loan, never shared with another loan for the same borrower.
+
+Run with:
+    python -m pytest test/test_credit_report_cache.py -v
+"""
+
+import re
+import pytest
+from pathlib import Path
+
+from models import DocumentType, LoanStatus
+from scenarios import create_scenario_clean_approval
+from tools_loan_processor import file_manager, order_credit_report
+from src.loan_underwriter.external_systems import seed_simulators
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def response_dir(tmp_path, monkeypatch):
+    """Keep stored credit pulls out of the shared ./loan_files tree"""
+    monkeypatch.setattr(file_manager, "response_dir", tmp_path)
+
+
+def new_loan() -> str:
+    scenario_description = create_scenario_clean_approval()
+    return scenario_description.split("Loan Number: ")[1].split("\n")[0]
+
+
+def transaction_id(result: str) -> str:
+    return re.search(r"Transaction ID: (\S+)", result).group(1)
+
+
+class TestCreditReportCache:
+
+    async def test_same_loan_replays_other_loan_pulls_fresh(self):
+        seed_simulators(7)
+        first_loan = new_loan()
+        second_loan = new_loan()  # same borrower and SSN
+
+        first = await order_credit_report(first_loan)
+        assert "Credit report received successfully" in first
+
+        replay = await order_credit_report(first_loan)
+        assert "Reusing" in replay
+        assert transaction_id(replay) == transaction_id(first)
+
+        other = await order_credit_report(second_loan)
+        assert "Credit report received successfully" in other
+        assert transaction_id(other) != transaction_id(first)
+
+        for loan_number in (first_loan, second_loan):
+            Path(f"./loan_files/active/{loan_number}.json").unlink()
+
+    async def test_replay_does_not_add_a_second_report(self):
+        seed_simulators(7)
+        loan_number = new_loan()
+
+        await order_credit_report(loan_number)
+        loan_file = file_manager.load_loan_file(loan_number)
+        loan_file.update_status(LoanStatus.APPRAISAL_ORDERED, "loan_processor", "Appraisal ordered")
+        file_manager.save_loan_file(loan_file)
+
+        replay = await order_credit_report(loan_number)
+        assert "Reusing" in replay
+
+        loan_file = file_manager.load_loan_file(loan_number)
+        credit_docs = [d for d in loan_file.documents if d.document_type == DocumentType.CREDIT_REPORT]
+        assert len(credit_docs) == 1
+        assert loan_file.status == LoanStatus.APPRAISAL_ORDERED
+
+        Path(f"./loan_files/active/{loan_number}.json").unlink()
@@ -0,0 +1,149 @@
+"""
+LoanFileManager storage tests: the parsed-file cache in load_loan_file,
+atomic saves and response cache expiry
+
+Run with:
+    python -m pytest test/test_file_manager.py -v
+"""
+
+import os
+import time
+import pytest
+from pathlib import Path
+
+from file_manager import LoanFileManager
+from models import ExternalSystemResponse
+from scenarios import create_scenario_clean_approval
+
+
+@pytest.fixture
+def loan_file():
+    """A clean-approval LoanFile, detached from ./loan_files"""
+    scenario_description = create_scenario_clean_approval()
+    loan_number = scenario_description.split("Loan Number: ")[1].split("\n")[0]
+    loaded = LoanFileManager().load_loan_file(loan_number)
+    Path(f"./loan_files/active/{loan_number}.json").unlink()
+    return loaded
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return LoanFileManager(str(tmp_path / "loan_files"))
+
+
+class TestLoadCache:
+
+    def test_load_after_save_returns_new_content(self, manager, loan_file):
+        loan_number = loan_file.loan_info.loan_number
+        manager.save_loan_file(loan_file)
+        assert "Rate lock requested" not in manager.load_loan_file(loan_number).flags
+
+        loan_file.flags.append("Rate lock requested")
+        manager.save_loan_file(loan_file)
+
+        assert "Rate lock requested" in manager.load_loan_file(loan_number).flags
+
+    def test_mutating_a_loaded_file_does_not_leak_into_the_cache(self, manager, loan_file):
+        loan_number = loan_file.loan_info.loan_number
+        manager.save_loan_file(loan_file)
+
+        first = manager.load_loan_file(loan_number)
+        first.flags.append("unsaved change")
+        first.borrowers[0].first_name = "Changed"
+
+        second = manager.load_loan_file(loan_number)
+        assert second is not first
+        assert "unsaved change" not in second.flags
+        assert second.borrowers[0].first_name == loan_file.borrowers[0].first_name
+
+    def test_external_write_with_new_mtime_is_picked_up(self, manager, loan_file):
+        loan_number = loan_file.loan_info.loan_number
+        path = Path(manager.save_loan_file(loan_file))
+        manager.load_loan_file(loan_number)  # populate the cache
+
+        # Another process rewrites the file behind this manager's back
+        changed = loan_file.model_copy(deep=True)
+        changed.flags.append("edited elsewhere")
+        old_mtime = path.stat().st_mtime_ns
+        path.write_text(changed.model_dump_json(indent=2))
+        os.utime(path, ns=(old_mtime + 1_000_000_000, old_mtime + 1_000_000_000))
+
+        assert "edited elsewhere" in manager.load_loan_file(loan_number).flags
+
+
+class TestAtomicSave:
+
+    def test_save_leaves_no_temp_file(self, manager, loan_file):
+        manager.save_loan_file(loan_file)
+        manager.save_loan_file(loan_file, durable=True)
+
+        assert list(manager.active_dir.glob("*.tmp")) == []
+        assert [p.name for p in manager.active_dir.iterdir()] == [f"{loan_file.loan_info.loan_number}.json"]
+
+    def test_failed_serialization_keeps_previous_file(self, manager, loan_file, monkeypatch):
+        path = Path(manager.save_loan_file(loan_file))
+        before = path.read_bytes()
+
+        def broken_dump(self, **kwargs):
+            raise ValueError("cannot serialize")
+
+        monkeypatch.setattr(type(loan_file), "model_dump_json", broken_dump)
+        loan_file.flags.append("never written")
+        with pytest.raises(ValueError):
+            manager.save_loan_file(loan_file)
+        monkeypatch.undo()
+
+        assert path.read_bytes() == before
+        assert list(manager.active_dir.glob("*.tmp")) == []
+        assert "never written" not in manager.load_loan_file(loan_file.loan_info.loan_number).flags
+
+    def test_failed_write_keeps_previous_file(self, manager, loan_file, monkeypatch):
+        path = Path(manager.save_loan_file(loan_file))
+        before = path.read_bytes()
+
+        def crash(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("file_manager.os.replace", crash)
+        with pytest.raises(OSError):
+            manager.save_loan_file(loan_file)
+        monkeypatch.undo()
+
+        assert path.read_bytes() == before
+        assert list(manager.active_dir.glob("*.tmp")) == []
+
+
+def age_file(path: Path, days: int) -> None:
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+class TestResponseCache:
+
+    def response(self) -> ExternalSystemResponse:
+        return ExternalSystemResponse(success=True, system_name="CreditBureau", transaction_id="TXN-1")
+
+    def test_fresh_response_is_replayed(self, manager):
+        manager.store_cached_response("credit", "key", self.response())
+
+        replay = manager.load_cached_response("credit", "key", ExternalSystemResponse)
+        assert replay.transaction_id == "TXN-1"
+
+    def test_expired_response_is_deleted_on_read(self, manager):
+        manager.store_cached_response("credit", "key", self.response())
+        path = manager._response_cache_path("credit", "key")
+        age_file(path, days=2)
+
+        assert manager.load_cached_response("credit", "key", ExternalSystemResponse) is None
+        assert not path.exists()
+
+    def test_sweep_deletes_only_expired_responses(self, manager):
+        manager.store_cached_response("credit", "old", self.response())
+        manager.store_cached_response("flood", "recent", self.response())
+        age_file(manager._response_cache_path("credit", "old"), days=2)
+        age_file(manager._response_cache_path("flood", "recent"), days=2)
+
+        manager._cleanup_expired_responses()
+
+        assert not manager._response_cache_path("credit", "old").exists()
+        assert manager._response_cache_path("flood", "recent").exists()
@@ -0,0 +1,81 @@
+"""
+Unit tests for the orchestrator's keyword routing (routing.route_message)
+
+Run with:
+    python -m pytest test/test_routing.py -v
+"""
+
+import json
+
+import pytest
+
+from routing import ROUTE_TERMINATE, route_message
+
+
+def summary(status: str, *findings: str) -> str:
+    return json.dumps({"status": status, "findings": list(findings), "next_action": "continue"})
+
+
+class TestPhaseSummaryRouting:
+
+    @pytest.mark.parametrize("status, target", [
+        ("SUBMITTED", "underwriter_agent"),
+        ("CONDITIONS_ISSUED", "loan_processor_agent"),
+        ("CONDITIONS_CLEARED", "underwriter_agent"),
+        ("APPROVED", ROUTE_TERMINATE),
+        ("CLEAR_TO_CLOSE", ROUTE_TERMINATE),
+        ("DENIED", ROUTE_TERMINATE),
+        ("BLOCKED", None),
+        ("SOMETHING_ELSE", None),
+    ])
+    def test_routes_on_status(self, status, target):
+        assert route_message(summary(status)) == target
+
+    def test_status_is_case_and_space_insensitive(self):
+        assert route_message(summary(" conditions issued ")) == "loan_processor_agent"
+
+    def test_submission_with_approved_documents_goes_to_underwriter(self):
+        message = summary("SUBMITTED", "Documents: 5 approved", "LTV 80.00%")
+        assert route_message(message) == "underwriter_agent"
+
+    def test_conditions_with_approved_credit_go_to_processor(self):
+        message = summary("CONDITIONS_ISSUED", "CREDIT APPROVED", "Need 2 months bank statements")
+        assert route_message(message) == "loan_processor_agent"
+
+    def test_findings_never_terminate(self):
+        message = summary("SUBMITTED", "clear to close pending", "no loans denied")
+        assert route_message(message) != ROUTE_TERMINATE
+
+    def test_json_that_is_not_a_summary_goes_to_model(self):
+        assert route_message('{"decision": "approved"}') is None
+
+
+class TestPlainTextRouting:
+
+    def test_submitted_tool_output(self):
+        text = "📤 SUBMITTING TO UNDERWRITING\n  Documents: 5 approved\n\n✅ File submitted successfully"
+        assert route_message(text) == "underwriter_agent"
+
+    def test_all_conditions_cleared(self):
+        assert route_message("Conditions Cleared: 3\n\n✅ ALL CONDITIONS CLEARED") == "underwriter_agent"
+
+    def test_conditions_issued(self):
+        assert route_message("Conditions issued for loan LN-1") == "loan_processor_agent"
+
+    def test_final_decision_terminates(self):
+        assert route_message("APPROVED - clear to close") == ROUTE_TERMINATE
+
+    @pytest.mark.parametrize("text", [
+        "❌ ERROR: Loan file LN-1 not found",
+        "❌ TIMEOUT: order_appraisal did not respond within 5s.",
+        "❌ SUBMISSION BLOCKED - CRITICAL ERRORS:\n✅ File submitted successfully",
+    ])
+    def test_problem_reports_go_to_model(self, text):
+        assert route_message(text) is None
+
+    def test_words_inside_lines_do_not_match(self):
+        text = "No timeout issues, no error found\nCredit was approved\n✅ File submitted successfully"
+        assert route_message(text) == "underwriter_agent"
+
+    def test_unrecognized_text_goes_to_model(self):
+        assert route_message("Working on it") is None
@@ -0,0 +1,66 @@
+"""
+Submission readiness (check_submission_ready) and submit_to_underwriting
+must enforce the same rules.
+
+Run with:
+    python -m pytest test/test_submission_validation.py -v
+"""
+
+import pytest
+from pathlib import Path
+
+from models import LoanStatus, DocumentType
+from scenarios import create_scenario_clean_approval
+from tools_loan_processor import (
+    file_manager, verify_loan_documents, order_credit_report, calculate_loan_ratios,
+    check_submission_ready, submit_to_underwriting
+)
+from src.loan_underwriter.external_systems import seed_simulators
+
+pytestmark = pytest.mark.asyncio
+
+
+async def prepared_loan() -> str:
+    """A clean-approval file with credit pulled and ratios calculated"""
+    seed_simulators(7)  # no simulated bureau errors, same credit file every run
+    scenario_description = create_scenario_clean_approval()
+    loan_number = scenario_description.split("Loan Number: ")[1].split("\n")[0]
+    await verify_loan_documents(loan_number)
+    await order_credit_report(loan_number)
+    await calculate_loan_ratios(loan_number)
+    return loan_number
+
+
+class TestSubmissionValidation:
+
+    async def test_missing_document_blocks_both(self):
+        loan_number = await prepared_loan()
+
+        loan_file = file_manager.load_loan_file(loan_number)
+        loan_file.documents = [d for d in loan_file.documents if d.document_type != DocumentType.W2]
+        file_manager.save_loan_file(loan_file)
+
+        blockers = await check_submission_ready(loan_number)
+        assert blockers == [f"Missing required document: {DocumentType.W2.value}"]
+
+        result = await submit_to_underwriting(loan_number)
+        assert "SUBMISSION BLOCKED" in result
+        assert blockers[0] in result
+
+        loan_file = file_manager.load_loan_file(loan_number)
+        assert loan_file.status != LoanStatus.SUBMITTED_TO_UNDERWRITING
+
+        Path(f"./loan_files/active/{loan_number}.json").unlink()
+
+    async def test_ready_file_is_submitted(self):
+        loan_number = await prepared_loan()
+
+        assert await check_submission_ready(loan_number) == []
+
+        result = await submit_to_underwriting(loan_number)
+        assert "SUBMISSION BLOCKED" not in result
+
+        loan_file = file_manager.load_loan_file(loan_number)
+        assert loan_file.status == LoanStatus.SUBMITTED_TO_UNDERWRITING
+
+        Path(f"./loan_files/active/{loan_number}.json").unlink()
@@ -0,0 +1,107 @@
+"""
+Scheduling tests for task_dag.run_dag with stub steps (no agents involved)
+
+Run with:
+    python -m pytest test/test_task_dag.py -v
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Tuple
+
+import pytest
+
+from task_dag import run_dag
+
+pytestmark = pytest.mark.asyncio
+
+STEP_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class StubStep:
+    name: str
+    dependencies: Tuple[str, ...] = ()
+
+
+class Recorder:
+    """run_step stub that logs start/finish order and fails the named steps"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.events = []
+        self.started = set()
+
+    async def __call__(self, step: StubStep) -> str:
+        self.started.add(step.name)
+        self.events.append(("start", step.name))
+        await asyncio.sleep(STEP_SECONDS)
+        self.events.append(("end", step.name))
+        if step.name in self.failing:
+            raise ValueError(f"{step.name} broke")
+        return f"{step.name} done"
+
+    def index(self, kind: str, name: str) -> int:
+        return self.events.index((kind, name))
+
+
+class TestRunDag:
+
+    async def test_dependencies_finish_before_dependents_start(self):
+        steps = [
+            StubStep("documents"),
+            StubStep("credit"),
+            StubStep("analysis", ("documents", "credit")),
+            StubStep("decision", ("analysis",)),
+        ]
+        recorder = Recorder()
+
+        results = await asyncio.wait_for(run_dag(steps, recorder), timeout=2)
+
+        assert results == {step.name: f"{step.name} done" for step in steps}
+        assert recorder.index("end", "documents") < recorder.index("start", "analysis")
+        assert recorder.index("end", "credit") < recorder.index("start", "analysis")
+        assert recorder.index("end", "analysis") < recorder.index("start", "decision")
+
+    async def test_siblings_run_concurrently(self):
+        steps = [StubStep(f"sibling_{i}") for i in range(5)]
+        recorder = Recorder()
+
+        start = asyncio.get_running_loop().time()
+        await run_dag(steps, recorder)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        # Every sibling started before the first one finished
+        first_end = min(recorder.index("end", step.name) for step in steps)
+        assert all(recorder.index("start", step.name) < first_end for step in steps)
+        assert elapsed < STEP_SECONDS * 3
+
+    async def test_failed_step_releases_and_skips_dependents(self):
+        steps = [
+            StubStep("credit"),
+            StubStep("appraisal"),
+            StubStep("analysis", ("credit", "appraisal")),
+            StubStep("decision", ("analysis",)),
+            StubStep("property_review", ("appraisal",)),
+        ]
+        recorder = Recorder(failing={"credit"})
+
+        # Dependents must not wait forever on the failed step's event
+        results = await asyncio.wait_for(run_dag(steps, recorder), timeout=2)
+
+        assert isinstance(results["credit"], ValueError)
+        assert isinstance(results["analysis"], RuntimeError)
+        assert "credit" in str(results["analysis"])
+        assert isinstance(results["decision"], RuntimeError)
+        assert results["property_review"] == "property_review done"
+        assert "analysis" not in recorder.started
+        assert "decision" not in recorder.started
+
+    async def test_unknown_dependency_is_rejected(self):
+        with pytest.raises(ValueError, match="unknown"):
+            await run_dag([StubStep("analysis", ("credit",))], Recorder())
+
+    async def test_cycle_is_rejected(self):
+        steps = [StubStep("a", ("b",)), StubStep("b", ("a",)), StubStep("c")]
+        with pytest.raises(ValueError, match="cycle"):
+            await asyncio.wait_for(run_dag(steps, Recorder()), timeout=2)
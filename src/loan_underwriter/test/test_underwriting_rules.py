@@ -0,0 +1,68 @@
+"""
+Parity of the bitmask underwriting rules (src/codes/underwriting_rules.py)
+with the original list-based check_underwriting_conditions
+
+Run with:
+    python -m pytest test/test_underwriting_rules.py -v
+"""
+
+import itertools
+import pytest
+
+from src.codes.underwriting_rules import (
+    check_underwriting_conditions_batch, conditions_from_mask, underwriting_condition_mask
+)
+
+
+def legacy_conditions(ltv_ratio, dti_ratio, credit_score, reserves, appraisal_value, loan_amount) -> dict:
+    """The rules as they were written before the bitmask rewrite"""
+    conditions = []
+    if dti_ratio > 43:
+        conditions.append("VOE: Verify employment stability due to high DTI")
+    if ltv_ratio > 80:
+        conditions.append("PMI: Private Mortgage Insurance required")
+    if credit_score < 620:
+        conditions.append("LOE: Letter of Explanation for credit score below 620")
+    if reserves < 2:
+        conditions.append("RESERVES: Provide proof of 2 months PITI reserves")
+    if appraisal_value < loan_amount / (ltv_ratio / 100):
+        conditions.append("APPRAISAL: Value discrepancy - review comparables")
+    if not conditions:
+        return {"status": "CLEAR_TO_CLOSE", "conditions": []}
+    return {"status": "CONDITIONAL_APPROVAL", "conditions": conditions}
+
+
+CLEAN = dict(ltv_ratio=80.0, dti_ratio=36.0, credit_score=740, reserves=6,
+             appraisal_value=400000.0, loan_amount=320000.0)
+
+LOAN_FILES = {
+    "clean": CLEAN,
+    "high_dti": {**CLEAN, "dti_ratio": 48.5},
+    "high_ltv": {**CLEAN, "ltv_ratio": 95.0, "loan_amount": 380000.0},
+    "low_credit": {**CLEAN, "credit_score": 600},
+    "low_reserves": {**CLEAN, "reserves": 1},
+    "appraisal_gap": {**CLEAN, "appraisal_value": 390000.0},
+    "at_thresholds": {**CLEAN, "dti_ratio": 43.0, "credit_score": 620, "reserves": 2},
+    "everything": dict(ltv_ratio=97.0, dti_ratio=52.0, credit_score=580, reserves=0,
+                       appraisal_value=300000.0, loan_amount=388000.0),
+}
+
+
+class TestUnderwritingRuleParity:
+
+    @pytest.mark.parametrize("name", LOAN_FILES)
+    def test_matches_legacy_rules(self, name):
+        loan = LOAN_FILES[name]
+        assert conditions_from_mask(underwriting_condition_mask(**loan)) == legacy_conditions(**loan)
+
+    def test_matches_legacy_rules_across_grid(self):
+        for ltv, dti, score, reserves, value in itertools.product(
+                (75.0, 80.0, 80.5, 95.0), (36.0, 43.0, 43.1, 55.0), (580, 619, 620, 760),
+                (0, 1, 2, 6), (350000.0, 400000.0, 450000.0)):
+            loan = dict(ltv_ratio=ltv, dti_ratio=dti, credit_score=score, reserves=reserves,
+                        appraisal_value=value, loan_amount=320000.0)
+            assert conditions_from_mask(underwriting_condition_mask(**loan)) == legacy_conditions(**loan), loan
+
+    def test_batch_matches_single_files(self):
+        loans = list(LOAN_FILES.values())
+        assert check_underwriting_conditions_batch(loans) == [legacy_conditions(**loan) for loan in loans]
@@ -0,0 +1,97 @@
+"""
+Retry behaviour of external_systems.with_retry: attempt count, backoff cap,
+per-attempt timeout and exhaustion
+
+Run with:
+    python -m pytest test/test_with_retry.py -v
+"""
+
+import asyncio
+import pytest
+
+from src.loan_underwriter import external_systems
+from src.loan_underwriter.external_systems import (
+    RETRY_JITTER, SystemTimeoutException, retry_deadline, with_retry
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+def flaky(failures: int, result: str = "ok"):
+    """Stub simulator call that times out `failures` times, then succeeds"""
+    calls = []
+
+    async def call():
+        calls.append(len(calls) + 1)
+        if len(calls) <= failures:
+            raise SystemTimeoutException(f"timeout #{len(calls)}")
+        return result
+
+    return call, calls
+
+
+class TestWithRetry:
+
+    async def test_retries_until_success(self):
+        call, calls = flaky(failures=2)
+
+        assert await with_retry(retries=3, base=0)(call)() == "ok"
+        assert len(calls) == 3
+
+    async def test_exhaustion_reraises_last_error(self):
+        call, calls = flaky(failures=10)
+
+        with pytest.raises(SystemTimeoutException, match="timeout #3"):
+            await with_retry(retries=3, base=0)(call)()
+        assert len(calls) == 3
+
+    async def test_other_errors_are_not_retried(self):
+        calls = []
+
+        async def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await with_retry(retries=3, base=0)(broken)()
+        assert len(calls) == 1
+
+    async def test_slow_attempt_is_cut_off_and_retried(self):
+        calls = []
+
+        async def slow_then_fast():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+            return "ok"
+
+        assert await with_retry(retries=2, base=0, timeout=0.05)(slow_then_fast)() == "ok"
+        assert len(calls) == 2
+
+    async def test_attempt_timeouts_become_system_timeout(self):
+        async def hangs():
+            await asyncio.sleep(1)
+
+        with pytest.raises(SystemTimeoutException, match="did not respond within 0.05s"):
+            await with_retry(retries=2, base=0, timeout=0.05)(hangs)()
+
+    async def test_backoff_doubles_up_to_cap(self, monkeypatch):
+        delays = []
+
+        async def record_sleep(seconds):
+            delays.append(seconds)
+
+        monkeypatch.setattr(external_systems.asyncio, "sleep", record_sleep)
+        call, _ = flaky(failures=4)
+
+        assert await with_retry(retries=5, base=1, cap=2)(call)() == "ok"
+        expected = [1, 2, 2, 2]
+        assert len(delays) == len(expected)
+        for delay, backoff in zip(delays, expected):
+            assert backoff <= delay <= backoff + RETRY_JITTER
+
+    async def test_deadline_covers_every_attempt_and_backoff(self):
+        wrapped = with_retry(retries=3, base=0.1, cap=2.0, timeout=5.0)(flaky(0)[0])
+
+        assert wrapped.deadline == retry_deadline(3, 0.1, 2.0, 5.0)
+        assert wrapped.deadline == pytest.approx(3 * 5.0 + 0.1 + 0.2 + 2 * RETRY_JITTER)
@@ -2,11 +2,11 @@
 Underwriter tools with concurrent safety
 """
 
-import random
+from bisect import bisect_right
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import Dict, List
-import uuid
+import secrets
 import copy  # ← ADD THIS for run_automated_underwriting
 
 from models import (
@@ -14,11 +14,27 @@ from models import (
     ConditionType, ConditionSeverity, DocumentType, DocumentStatus
 )
 from file_manager import file_manager  # ← Import singleton instance
-from external_systems import (
+from src.loan_underwriter.external_systems import (
     AutomatedUnderwritingSimulator, SystemTimeoutException,
     ExternalSystemException
 )
 
+# Credit score tiers: bisect_right(_CREDIT_THRESHOLDS, score) indexes _CREDIT_TIERS
+_CREDIT_THRESHOLDS = (580, 620, 680, 740)
+_CREDIT_TIERS = (
+    "  ❌ VERY POOR - May not qualify",
+    "  🚨 POOR - High Risk (FHA minimum)",
+    "  ⚠️  FAIR - Acceptable (conventional minimum)",
+    "  ✅ GOOD - Low Risk",
+    "  ✅ EXCELLENT - Very Low Risk",
+)
+
+
+def bucket_credit_score(credit_score: int) -> str:
+    """Return the credit review tier line for a score."""
+    return _CREDIT_TIERS[bisect_right(_CREDIT_THRESHOLDS, credit_score)]
+
+
 async def run_automated_underwriting(loan_number: str) -> str:
     """Run automated underwriting - TRUE CONCURRENT SAFE"""
 
@@ -46,7 +62,7 @@ async def run_automated_underwriting(loan_number: str) -> str:
         result.append(f"📡 Submitting to Desktop Underwriter (DU)...")
 
         # This takes 2-4 seconds but doesn't block other loans!
-        au_response = AutomatedUnderwritingSimulator.run_automated_underwriting(loan_file_copy)
+        au_response = await AutomatedUnderwritingSimulator.run_automated_underwriting(loan_file_copy)
 
         result.append(f"✅ Automated underwriting complete")
         result.append(f"Transaction ID: {au_response.transaction_id}")
@@ -105,7 +121,7 @@ async def run_automated_underwriting(loan_number: str) -> str:
                 loan_file.underwriting_decisions = []
 
             au_decision = UnderwritingDecision(
-                decision_id=f"DEC-{uuid.uuid4().hex[:8].upper()}",
+                decision_id=f"DEC-{secrets.token_hex(4).upper()}",
                 decision_date=datetime.now(),
                 underwriter_name="automated_underwriting_system",
                 decision_type="automated_findings",
@@ -191,16 +207,7 @@ async def review_credit_profile(loan_number: str) -> str:
         result.append(f"\n📊 CREDIT SCORE ANALYSIS:")
         result.append(f"  Score: {credit.credit_score}")
 
-        if credit.credit_score >= 740:
-            result.append(f"  ✅ EXCELLENT - Very Low Risk")
-        elif credit.credit_score >= 680:
-            result.append(f"  ✅ GOOD - Low Risk")
-        elif credit.credit_score >= 620:
-            result.append(f"  ⚠️  FAIR - Acceptable (conventional minimum)")
-        elif credit.credit_score >= 580:
-            result.append(f"  🚨 POOR - High Risk (FHA minimum)")
-        else:
-            result.append(f"  ❌ VERY POOR - May not qualify")
+        result.append(bucket_credit_score(credit.credit_score))
 
         result.append(f"\n📋 TRADELINE ANALYSIS:")
         result.append(f"  Total Accounts: {len(credit.tradelines)}")
@@ -665,7 +672,7 @@ async def issue_underwriting_conditions(
                 cond_type = ConditionType.TITLE
 
             condition = UnderwritingCondition(
-                condition_id=f"COND-{uuid.uuid4().hex[:8].upper()}",
+                condition_id=f"COND-{secrets.token_hex(4).upper()}",
                 condition_type=cond_type,
                 severity=ConditionSeverity.REQUIRED,  # Default to REQUIRED
                 category="underwriting",  # Default category
@@ -689,7 +696,7 @@ async def issue_underwriting_conditions(
         result.append(f"Total Conditions Issued: {len(new_conditions)}")
 
         decision = UnderwritingDecision(
-            decision_id=f"DEC-{uuid.uuid4().hex[:8].upper()}",
+            decision_id=f"DEC-{secrets.token_hex(4).upper()}",
             decision_date=datetime.now(),
             underwriter_name="underwriter_agent",
             decision_type="approve_with_conditions",
@@ -738,7 +745,7 @@ async def issue_final_approval(loan_number: str, approval_notes: str = "Automate
             return "\n".join(result)
 
         decision = UnderwritingDecision(
-            decision_id=f"DEC-{uuid.uuid4().hex[:8].upper()}",
+            decision_id=f"DEC-{secrets.token_hex(4).upper()}",
             decision_date=datetime.now(),
             underwriter_name="underwriter_agent",
             decision_type="approve",
@@ -781,7 +788,7 @@ async def deny_loan(loan_number: str, denial_reason: str) -> str:
         result.append("=" * 60)
 
         decision = UnderwritingDecision(
-            decision_id=f"DEC-{uuid.uuid4().hex[:8].upper()}",
+            decision_id=f"DEC-{secrets.token_hex(4).upper()}",
             decision_date=datetime.now(),
             underwriter_name="underwriter_agent",
             decision_type="deny",